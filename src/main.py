@@ -1,6 +1,7 @@
 import pygame
 from settings1 import *
 from scenes.menu import MenuScene
+from utils.asset_manager import ASSETS
 
 pygame.init()
 
@@ -34,5 +35,8 @@ class Game:
             self.current_scene.draw()
             pygame.display.flip()
 
+            # фоновите asset jobs, които са готови, влизат в кеша
+            ASSETS.pump()
+
 if __name__ == "__main__":
     Game().run()
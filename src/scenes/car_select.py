@@ -2,6 +2,7 @@ import pygame
 import os
 import sys
 from settings1 import *
+from utils.asset_manager import ASSETS
 
 class CarSelectionScene:
     def __init__(self, game):
@@ -21,12 +22,8 @@ class CarSelectionScene:
             self.small_font = pygame.font.SysFont("Arial", 45, bold=True)
 
         # arrows
-        self.arrow_left = pygame.image.load(
-            os.path.join(self.assets_path, "Basic/arrow_left.png")
-        ).convert_alpha()
-        self.arrow_right = pygame.image.load(
-            os.path.join(self.assets_path, "Basic/arrow_right.png")
-        ).convert_alpha()
+        self.arrow_left = ASSETS.image(os.path.join(self.assets_path, "Basic/arrow_left.png"))
+        self.arrow_right = ASSETS.image(os.path.join(self.assets_path, "Basic/arrow_right.png"))
 
         w, h = self.game.screen.get_size()
         self.left_rect = self.arrow_left.get_rect(center=(w // 2 - 550, h // 2 - 150))
@@ -52,15 +49,13 @@ class CarSelectionScene:
         car_front = car_data["front"]
 
         car_path = os.path.join(self.assets_path, f"Car images/{car_folder}/{car_front}")
-        if not os.path.exists(car_path):
+        if not ASSETS.exists(car_path):
             raise FileNotFoundError(f"Missing car image: {car_path}")
 
-        self.car_image = pygame.image.load(car_path).convert_alpha()
-
         w, h = self.game.screen.get_size()
         max_width = int(w * 0.35)
         max_height = int(h * 0.28)
-        self.car_image = pygame.transform.smoothscale(self.car_image, (max_width, max_height))
+        self.car_image = ASSETS.image(car_path, size=(max_width, max_height))
         self.car_rect = self.car_image.get_rect(center=(w // 2, h // 2 - 150))
 
         self.car_name = car_folder.replace("_", " ").upper()
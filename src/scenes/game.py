@@ -2,26 +2,133 @@ import sys
 import os
 import pygame
 import math
+from functools import partial
 
-from settings1 import CAR_ASSETS
+from settings1 import CAR_ASSETS, GHOST_RACE_MAX, GHOST_SIMPLIFY_EPS
 from utils.profile_manager import save_profile
-from systems.ghost_system import GhostSystem
+from systems.ghost_system import (
+    GhostSystem,
+    ghost_sprite_names,
+    load_best_ghost,
+    load_player_ghost,
+    register_ghost_sprites,
+    shutdown_writer,
+)
+from systems.ghost_race import GhostRace
+from systems.split_timer import SplitTimer
+from systems.draw_list import DrawList, world_clip
+from utils.leaderboard_index import GHOST_DIR, leaderboard
 from track.track_data import LEVELS
 from track.track import Track, lerp
+from track.projection import ProjectionTable, FrameView
 from systems.props_system import PropsSystem
 from systems.obstacles_system import ObstaclesSystem
+from utils.asset_manager import ASSETS
+from utils.sprite_cache import SPRITE_CACHE
+
+
+GHOST_ALPHA = 120  # PB ghost-ът
+RACE_GHOST_ALPHA = 70  # last attempt + другите профили
 
 
 def load_crop_alpha(path: str) -> pygame.Surface:
-    img = pygame.image.load(path).convert_alpha()
-    rect = img.get_bounding_rect()
-    if rect.width > 0 and rect.height > 0:
-        img = img.subsurface(rect).copy()
-    return img
+    return ASSETS.image(path, crop=True)
+
+
+def game_asset_specs(screen_size, level: int, car_id: int) -> list:
+    """
+    Всички assets, които GameScene(level, car_id) зарежда, като specs за ASSETS.preload().
+    Трябва да съвпада с ASSETS.image()/sound() извикванията в GameScene.__init__.
+    """
+    screen_w, screen_h = screen_size
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+    assets_path = os.path.join(project_root, "assets")
+    level_path = os.path.join(assets_path, "Levels", f"level_{level}")
+    group = f"level_{level}"
+
+    horizon_h = int(screen_h * 0.28)
+    specs = [
+        dict(path=os.path.join(level_path, "horizon.png"), size=(screen_w, horizon_h), crop=True, group=group),
+        dict(path=os.path.join(level_path, "background.png"), size=(screen_w, screen_h - horizon_h), group=group),
+        dict(path=os.path.join(assets_path, "Basic", "finish", "finish_line.png")),
+        dict(
+            path=os.path.join(assets_path, "Basic", "finish", "finish_end_text_results.png"),
+            fit=(int(screen_w * 0.60), int(screen_h * 0.65)),
+        ),
+    ]
+
+    car_data = CAR_ASSETS.get(car_id)
+    if car_data:
+        car_dir = os.path.join(assets_path, "Car images", car_data["folder"])
+        sprite_key = f"ghost:{car_data['folder']}"
+        for side in ("back", "left", "right"):
+            # ghost sprite-овете (mip нивата им) се строят във фона заедно с колата
+            sprites = [(ghost_sprite_names(sprite_key, a)[side], a) for a in (GHOST_ALPHA, RACE_GHOST_ALPHA)]
+            specs.append(dict(path=os.path.join(car_dir, car_data[side]), scale=2.0, sprites=sprites))
+
+    # props/obstacles: всички PNG-та в папките на level-а (superset на ползваните)
+    for sub_dir in ("props", "obstacles"):
+        d = os.path.join(level_path, sub_dir)
+        if ASSETS.isdir(d):
+            for fn in sorted(ASSETS.listdir(d)):
+                if fn.lower().endswith(".png"):
+                    path = os.path.join(d, fn)
+                    specs.append(dict(path=path, group=group, sprites=[(ASSETS.asset_name(path), None)]))
+
+    sounds_dir = os.path.join(assets_path, "Sounds")
+    for fn in ("car_acceleration_sound_fx.wav", "car_skidding_sound_fx.wav", "gaming-victory.mp3"):
+        specs.append(dict(kind="sound", path=os.path.join(sounds_dir, fn)))
+
+    return specs
+
+
+def profile_username(game) -> str:
+    prof = getattr(game, "current_profile", None)
+    if prof and isinstance(prof, dict) and prof.get("username"):
+        return str(prof["username"])
+    return "Player"
+
+
+def load_level_ghosts(username: str, level: int) -> dict:
+    """
+    Ghost данните на GameScene(level): best ghost-ът на играча + до GHOST_RACE_MAX - 2
+    best ghost-а на другите профили (по leaderboard индекса, който се валидира тук).
+    Пуска се във фоновия loading job.
+    """
+    best = load_player_ghost(GHOST_DIR, username, level)
+
+    # индексът е сортиран по best_time -> отваряме само ghost-ите, които ще се карат
+    # (PB и last attempt заемат първите 2 места в GhostRace)
+    max_others = max(0, GHOST_RACE_MAX - 2)
+    others = []
+    for other, _meta in leaderboard().ghosts(level):
+        if len(others) >= max_others:
+            break
+        if other == username:
+            continue
+        data = load_best_ghost(GHOST_DIR, other, level)
+        if data is not None:
+            others.append((other, data))
+    return {"best": best, "others": others}
+
+
+def preload_game(game, level: int, car_id: int):
+    """LoadJob с assets-ите, mip нивата и ghost данните на GameScene(level, car_id)."""
+    return ASSETS.preload(
+        game_asset_specs(game.screen.get_size(), level, car_id),
+        tasks={"ghosts": partial(load_level_ghosts, profile_username(game), level)},
+    )
+
+
+def unload_level_assets(level: int) -> None:
+    """Освобождава level-specific assets (background, horizon, props) и scale-натите им копия."""
+    for name in ASSETS.unload_group(f"level_{level}"):
+        SPRITE_CACHE.discard(name)
 
 
 class GameScene:
-    def __init__(self, game, level, car_id):
+    def __init__(self, game, level, car_id, preloaded=None):
+        """preloaded: LoadJob.results от preload_game(); без него ghost-ите се четат синхронно."""
         self.game = game
         self.level = level
         self.car_id = car_id
@@ -35,6 +142,7 @@ class GameScene:
 
         self.assets_path = os.path.join(project_root, "assets")
         self.level_path = os.path.join(self.assets_path, "Levels", f"level_{level}")
+        self.asset_group = f"level_{level}"
         self.finish_path = os.path.join(self.assets_path, "Basic", "finish")
 
         # -------- COLORS --------
@@ -63,33 +171,32 @@ class GameScene:
 
         # -------- HORIZON --------
         horizon_path = os.path.join(self.level_path, "horizon.png")
-        if not os.path.exists(horizon_path):
+        if not ASSETS.exists(horizon_path):
             raise FileNotFoundError(f"Missing horizon.png in {self.level_path}")
 
         self.horizon_h = int(self.screen_h * 0.28)
-        self.horizon = load_crop_alpha(horizon_path)
-        self.horizon = pygame.transform.smoothscale(self.horizon, (self.screen_w, self.horizon_h))
+        self.horizon = ASSETS.image(
+            horizon_path, size=(self.screen_w, self.horizon_h), crop=True, group=self.asset_group
+        )
 
         self.road_top_y = self.horizon_h
         self.road_bottom_y = self.screen_h
 
         # -------- GROUND --------
         bg_path = os.path.join(self.level_path, "background.png")
-        if not os.path.exists(bg_path):
+        if not ASSETS.exists(bg_path):
             raise FileNotFoundError(f"Missing background.png in {self.level_path}")
 
-        ground_raw = pygame.image.load(bg_path).convert_alpha()
         self.ground_area_y = self.road_top_y
         self.ground_area_h = self.screen_h - self.ground_area_y
-        self.ground = pygame.transform.smoothscale(ground_raw, (self.screen_w, self.ground_area_h))
-        self.ground_scroll = 0.0
+        self.ground = ASSETS.image(bg_path, size=(self.screen_w, self.ground_area_h), group=self.asset_group)
         self.ground_parallax = 0.35
 
         # -------- FINISH LINE (ON ROAD) --------
         finish_line_path = os.path.join(self.finish_path, "finish_line.png")
         self.finish_line_img = None
-        if os.path.exists(finish_line_path):
-            self.finish_line_img = pygame.image.load(finish_line_path).convert_alpha()
+        if ASSETS.exists(finish_line_path):
+            self.finish_line_img = ASSETS.image(finish_line_path)
 
         # колко преди финала да започне да се вижда
         self.finish_line_view_depth = 1200.0  # tweak: 800..1600
@@ -105,30 +212,17 @@ class GameScene:
         right_path = os.path.join(self.assets_path, "Car images", car_folder, car_data["right"])
 
         for pth in (back_path, left_path, right_path):
-            if not os.path.exists(pth):
+            if not ASSETS.exists(pth):
                 raise FileNotFoundError(f"Car image not found: {pth}")
 
-        self.car_back = pygame.image.load(back_path).convert_alpha()
-        self.car_left = pygame.image.load(left_path).convert_alpha()
-        self.car_right = pygame.image.load(right_path).convert_alpha()
-
         scale = 2.0
+        self.car_back = ASSETS.image(back_path, scale=scale)
+        self.car_left = ASSETS.image(left_path, scale=scale)
+        self.car_right = ASSETS.image(right_path, scale=scale)
 
-        def scale_img(img: pygame.Surface) -> pygame.Surface:
-            w, h = img.get_size()
-            return pygame.transform.smoothscale(img, (int(w * scale), int(h * scale)))
-
-        self.car_back = scale_img(self.car_back)
-        self.car_left = scale_img(self.car_left)
-        self.car_right = scale_img(self.car_right)
-
-        self.car_image = self.car_back
         self.player_anchor_y = self.screen_h - 40
-        self.player_center_x = self.screen_w // 2
 
         # --- Steering physics (velocity/drift feel) ---
-        self.steer_input = 0
-        self.player_vel_x = 0.0
         self.steer_accel = 2600.0
         self.steer_max_vel = 900.0
         self.friction = 0.88
@@ -140,10 +234,11 @@ class GameScene:
         self.road_width_far = 0.08
         self.gamma = 2.0
 
+        self.projection = None
+        self._ensure_projection()
+
         # -------- SETTINGS (PAUSE + VOLUME) --------
-        self.settings_open = False
         self.master_volume = 0.85
-        self.dragging_volume = False
 
         # -------- AUDIO --------
         self._init_audio()
@@ -152,27 +247,9 @@ class GameScene:
         self.dash_len = 3.2
 
         # -------- RUN STATE --------
-        self.distance = 0.0
         self.base_speed = 320.0
-        self.speed = self.base_speed
-
         self.checkpoints = self.track.checkpoints
-        self.last_checkpoint_index = -1
-
-        self.finished = False
-        self.run_started_ticks = pygame.time.get_ticks()
-        self.finish_time_seconds = None
-
-        # -------- PAUSE TIME ACCUMULATION --------
-        self.pause_accum_ms = 0
-        self.pause_started_ms = None
-
-        # -------- BEST TIME (loaded from profile) --------
-        self.best_time_seconds = None
-        self.is_new_best = False
-        self._load_best_time()
-
-        self.hit_timer = 0.0
+        self._init_run_state()
 
         # -------- PROPS --------
         props_names = None
@@ -201,6 +278,9 @@ class GameScene:
             count=props_count,
             names=props_names,
             weights=props_weights,
+            asset_group=self.asset_group,
+            # respawn връща до един checkpoint назад -> толкова се пази зад играча
+            keep_behind=self.track.checkpoint_every,
         )
 
         # -------- OBSTACLES --------
@@ -226,15 +306,17 @@ class GameScene:
             lane_width=0.62,
             collision_window=90.0,
             names=obstacle_names,
+            asset_group=self.asset_group,
+            keep_behind=self.track.checkpoint_every,
         )
 
         # -------- GHOST --------
         ghost_dir = os.path.join(self.project_root, "data", "ghosts")
 
-        prof = getattr(self.game, "current_profile", None)
-        username = "Player"
-        if prof and isinstance(prof, dict) and prof.get("username"):
-            username = str(prof["username"])
+        username = profile_username(self.game)
+        ghosts = (preloaded or {}).get("ghosts")
+        if ghosts is None:
+            ghosts = load_level_ghosts(username, self.level)
 
         self.ghost = GhostSystem(
             base_dir=ghost_dir,
@@ -245,11 +327,33 @@ class GameScene:
             car_right=self.car_right,
             enabled=True,
             sample_dt=1.0 / 30.0,
-            view_depth=1200.0,
-            alpha=120,
+            alpha=GHOST_ALPHA,
+            sprite_key=f"ghost:{car_folder}",
+            simplify_eps=GHOST_SIMPLIFY_EPS,
+            best=ghosts["best"],
         )
         self.ghost.start_run()
 
+        # -------- GHOST RACE (PB + last attempt + другите профили) --------
+        self.other_ghosts = ghosts["others"]
+
+        self.ghost_race = GhostRace(
+            sprite_sets=[
+                self.ghost.sprite_names,  # style 0: PB
+                register_ghost_sprites(f"ghost:{car_folder}", RACE_GHOST_ALPHA, self.car_back, self.car_left, self.car_right),
+            ],
+            view_depth=1200.0,
+            max_ghosts=GHOST_RACE_MAX,
+        )
+        self._rebuild_ghost_race()
+
+        # кадровият draw list за world sprites (преизползва се всеки кадър)
+        self.world_sprites = DrawList()
+
+        # -------- SPLITS (live +/- спрямо best ghost-а) --------
+        self.split_timer = SplitTimer(self.checkpoints)
+        self._refresh_split_reference()
+
         # -------- FINISH UI --------
         self._init_finish_ui()
 
@@ -279,6 +383,74 @@ class GameScene:
         btn_y = self.settings_rect.bottom - 85
         self.btn_main_menu = pygame.Rect(btn_x, btn_y, btn_w, btn_h)
 
+    def _init_run_state(self):
+        """Everything that a retry must reset (track, assets, systems and UI are reused)."""
+        self.distance = 0.0
+        self.speed = self.base_speed
+
+        self.last_checkpoint_index = -1
+
+        self.finished = False
+        self.run_started_ticks = pygame.time.get_ticks()
+        self.finish_time_seconds = None
+        self.split_flash = None  # (checkpoint index, delta, show until t)
+
+        # -------- PAUSE TIME ACCUMULATION --------
+        self.pause_accum_ms = 0
+        self.pause_started_ms = None
+        self.settings_open = False
+        self.dragging_volume = False
+
+        # -------- BEST TIME (loaded from profile) --------
+        self.best_time_seconds = None
+        self.is_new_best = False
+        self._load_best_time()
+
+        self.hit_timer = 0.0
+
+        # -------- PLAYER --------
+        self.car_image = self.car_back
+        self.player_center_x = self.screen_w // 2
+        self.steer_input = 0
+        self.player_vel_x = 0.0
+
+        self.ground_scroll = 0.0
+        self._view = None
+
+    def _rebuild_ghost_race(self):
+        ghosts = [("best", self.ghost.best, 0), ("last", self.ghost.last_attempt, 1)]
+        ghosts += [(name, data, 1) for name, data in self.other_ghosts]
+        self.ghost_race.set_ghosts(ghosts)
+
+    def _refresh_split_reference(self):
+        ref = self.ghost.times_at_distances(self.checkpoints)
+        if ref is None:
+            # няма ghost файл -> splits от профила (ако има)
+            prof = getattr(self.game, "current_profile", None) or {}
+            ref = prof.get("best_splits", {}).get(f"level_{self.level}")
+        self.split_timer.set_reference(ref)
+
+    def _update_splits(self, t: float):
+        k = self.split_timer.update(t, self.distance)
+        if k is not None:
+            self.split_flash = (k, self.split_timer.delta(k), t + 2.5)
+
+    def reset(self):
+        """
+        In-place retry: нулира само run state-а (distance, timers, checkpoints,
+        obstacles, ghost pointers) и преизползва всичко останало.
+        """
+        self._init_run_state()
+        self.obstacles.reset()
+        self.ghost.start_run()
+        self._rebuild_ghost_race()
+        self.split_timer.start()
+        self._refresh_split_reference()
+
+        if getattr(self, "audio_enabled", False):
+            self.ch_fx.stop()
+            self._restart_accel_sound()
+
     def _clamp(self, x: float, a: float = 0.0, b: float = 1.0) -> float:
         return max(a, min(b, x))
 
@@ -400,9 +572,9 @@ class GameScene:
         victory_path = os.path.join(sounds_dir, "gaming-victory.mp3")
 
         try:
-            self.snd_accel = pygame.mixer.Sound(accel_path)
-            self.snd_skid = pygame.mixer.Sound(skid_path)
-            self.snd_victory = pygame.mixer.Sound(victory_path)
+            self.snd_accel = ASSETS.sound(accel_path)
+            self.snd_skid = ASSETS.sound(skid_path)
+            self.snd_victory = ASSETS.sound(victory_path)
         except Exception as e:
             print("Failed to load sounds:", e)
             self.audio_enabled = False
@@ -448,7 +620,7 @@ class GameScene:
 
     # ---------------- FINISH LINE ----------------
 
-    def draw_finish_line(self):
+    def collect_finish_line(self, out: DrawList, view: FrameView):
         if not self.finish_line_img:
             return
 
@@ -456,18 +628,9 @@ class GameScene:
         if dist_ahead <= 0 or dist_ahead > self.finish_line_view_depth:
             return
 
-        top = self.road_top_y
-        bottom = self.road_bottom_y
-        height = bottom - top
-
-        t = dist_ahead / self.finish_line_view_depth
-        z_screen = 1.0 - t
-        depth = z_screen ** self.gamma  # 0..1
-
-        y = int(top + depth * height)
+        depth = view.depth_at(dist_ahead, self.finish_line_view_depth)  # 0..1
 
-        road_w = int(lerp(self.road_width_far, self.road_width_near, depth) * self.screen_w)
-        cx = self.track.road_center_x(self.screen_w, self.distance, depth)
+        y, road_w, cx = view.point(depth)
 
         target_w = max(2, int(road_w * 0.98))
         iw, ih = self.finish_line_img.get_size()
@@ -475,8 +638,7 @@ class GameScene:
         target_h = max(2, int(ih * s))
 
         spr = pygame.transform.smoothscale(self.finish_line_img, (target_w, target_h))
-        rect = spr.get_rect(midbottom=(cx, y))
-        self.game.screen.blit(spr, rect)
+        out.add(dist_ahead, spr, spr.get_rect(midbottom=(cx, y)))
 
     # ---------------- FINISH UI ----------------
 
@@ -484,16 +646,13 @@ class GameScene:
         basic_finish = os.path.join(self.assets_path, "Basic", "finish", "finish_end_text_results.png")
         level_finish = os.path.join(self.level_path, "finish.png")
 
-        finish_path = basic_finish if os.path.exists(basic_finish) else level_finish
+        finish_path = basic_finish if ASSETS.exists(basic_finish) else level_finish
         self.finish_panel = None
 
-        if os.path.exists(finish_path):
-            self.finish_panel = pygame.image.load(finish_path).convert_alpha()
+        if ASSETS.exists(finish_path):
             max_w = int(self.screen_w * 0.60)
             max_h = int(self.screen_h * 0.65)
-            w, h = self.finish_panel.get_size()
-            s = min(max_w / w, max_h / h)
-            self.finish_panel = pygame.transform.smoothscale(self.finish_panel, (int(w * s), int(h * s)))
+            self.finish_panel = ASSETS.image(finish_path, fit=(max_w, max_h))
 
         panel_w = self.finish_panel.get_width() if self.finish_panel else int(self.screen_w * 0.55)
         panel_h = self.finish_panel.get_height() if self.finish_panel else int(self.screen_h * 0.55)
@@ -556,10 +715,7 @@ class GameScene:
             pygame.draw.rect(self.game.screen, (30, 30, 30), self.finish_rect, border_radius=18)
             pygame.draw.rect(self.game.screen, (220, 220, 220), self.finish_rect, 3, border_radius=18)
 
-        prof = getattr(self.game, "current_profile", None)
-        username = "Player"
-        if prof and isinstance(prof, dict) and prof.get("username"):
-            username = str(prof["username"])
+        username = profile_username(self.game)
 
         time_s = float(self.finish_time_seconds or 0.0)
 
@@ -628,6 +784,8 @@ class GameScene:
     def handle_events(self):
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
+                self._leave()
+                shutdown_writer()
                 pygame.quit()
                 sys.exit()
 
@@ -686,11 +844,20 @@ class GameScene:
             self.steer_input = 1
 
     def _restart_level(self):
-        self.game.current_scene = GameScene(self.game, self.level, self.car_id)
+        self.reset()
+
+    def _leave(self):
+        """
+        Scene-ът се напуска: недовършеният ghost run не трябва да остава като
+        .run.tmp, а level assets (и scale-натите им копия) се освобождават.
+        """
+        self.ghost.abort_run()
+        unload_level_assets(self.level)
 
     def _abort_to_menu(self):
         # спри всичко аудио
         self._stop_all_audio()
+        self._leave()
 
         # safety: никакви “finish” флагове/време
         self.finished = False
@@ -710,6 +877,7 @@ class GameScene:
         self.game.current_scene = MenuScene(self.game)
 
     def _exit_to_menu(self):
+        self._leave()
         from scenes.menu import MenuScene
         self.game.current_scene = MenuScene(self.game)
 
@@ -739,8 +907,7 @@ class GameScene:
 
         # off-road penalty (near)
         p_near = 1.0
-        cx_near = self.track.road_center_x(self.screen_w, self.distance, p_near)
-        road_w_near = int(lerp(self.road_width_far, self.road_width_near, p_near) * self.screen_w)
+        _, road_w_near, cx_near = self._frame_view().point(p_near)
 
         left = cx_near - road_w_near // 2
         right = cx_near + road_w_near // 2
@@ -793,6 +960,7 @@ class GameScene:
             self.distance = self.track.length
             self.finished = True
             self.finish_time_seconds = self._run_time_seconds()
+            self._update_splits(self.finish_time_seconds)
 
             self._stop_all_audio()
             self._play_victory()
@@ -806,6 +974,7 @@ class GameScene:
         self.ground_scroll -= self.speed * dt * self.ground_parallax
         self.ground_scroll %= self.ground_area_h
 
+        self._update_splits(run_t)
         self.update_checkpoint()
 
         if self.hit_timer > 0:
@@ -822,14 +991,7 @@ class GameScene:
 
         hit = self.obstacles.check_hit(
             car_rect=car_rect,
-            track_center_fn=lambda p: self.track.road_center_x(self.screen_w, self.distance, p),
-            top_y=self.road_top_y,
-            bottom_y=self.road_bottom_y,
-            gamma=self.gamma,
-            distance=self.distance,
-            screen_w=self.screen_w,
-            road_width_far=self.road_width_far,
-            road_width_near=self.road_width_near,
+            view=self._frame_view(),
         )
         if hit:
             # self.respawn_to_checkpoint()
@@ -863,6 +1025,11 @@ class GameScene:
             self.best_time_seconds = finish
             best_dict[level_key] = round(finish, 3)
             prof["best_times"] = best_dict
+
+            splits = prof.get("best_splits", {})
+            splits[level_key] = [None if s is None else round(s, 3) for s in self.split_timer.splits]
+            prof["best_splits"] = splits
+
             save_profile(prof)
             return True
 
@@ -893,29 +1060,58 @@ class GameScene:
 
         self.game.screen.set_clip(old_clip)
 
-    def draw_road(self):
-        top = self.road_top_y
-        bottom = self.road_bottom_y
-        height = bottom - top
+    def _ensure_projection(self) -> ProjectionTable:
+        """Rebuilds the perspective tables only when screen/road params change."""
+        key = ProjectionTable.make_key(
+            screen_w=self.screen_w,
+            screen_h=self.screen_h,
+            top_y=self.road_top_y,
+            bottom_y=self.road_bottom_y,
+            segments=self.road_segments,
+            gamma=self.gamma,
+            road_width_far=self.road_width_far,
+            road_width_near=self.road_width_near,
+        )
+        if self.projection is None or self.projection.key != key:
+            self.projection = ProjectionTable(
+                screen_w=self.screen_w,
+                screen_h=self.screen_h,
+                top_y=self.road_top_y,
+                bottom_y=self.road_bottom_y,
+                segments=self.road_segments,
+                gamma=self.gamma,
+                road_width_far=self.road_width_far,
+                road_width_near=self.road_width_near,
+            )
+        return self.projection
+
+    def _frame_view(self) -> FrameView:
+        """Shared per-tick projection context; rebuilt only when distance/projection change."""
+        proj = self._ensure_projection()
+        if self._view is None or not self._view.is_current(self.track, proj, self.distance):
+            self._view = FrameView(self.track, proj, self.distance)
+        return self._view
 
-        for i in range(self.road_segments):
-            z0 = i / self.road_segments
-            z1 = (i + 1) / self.road_segments
+    def draw_road(self, view: FrameView):
+        proj = view.projection
+        ys = proj.ys
+        half_widths = proj.half_widths
+        dash_phase = proj.dash_phase
 
-            p0 = (z0 ** self.gamma)
-            p1 = (z1 ** self.gamma)
+        # всички center x-ове за лентите с едно batch извикване
+        centers = view.strip_centers
 
-            y0 = int(top + p0 * height)
-            y1 = int(top + p1 * height)
+        world_base = -self.distance * 0.06
 
-            w0 = int(lerp(self.road_width_far, self.road_width_near, p0) * self.screen_w)
-            w1 = int(lerp(self.road_width_far, self.road_width_near, p1) * self.screen_w)
+        for i in range(proj.segments):
+            y0 = ys[i]
+            y1 = ys[i + 1]
 
-            cx0 = self.track.road_center_x(self.screen_w, self.distance, p0)
-            cx1 = self.track.road_center_x(self.screen_w, self.distance, p1)
+            cx0 = centers[i]
+            cx1 = centers[i + 1]
 
-            l0, r0 = cx0 - w0 // 2, cx0 + w0 // 2
-            l1, r1 = cx1 - w1 // 2, cx1 + w1 // 2
+            l0, r0 = cx0 - half_widths[i], cx0 + half_widths[i]
+            l1, r1 = cx1 - half_widths[i + 1], cx1 + half_widths[i + 1]
 
             pygame.draw.polygon(
                 self.game.screen,
@@ -923,19 +1119,15 @@ class GameScene:
                 [(l0, y0), (r0, y0), (r1, y1), (l1, y1)]
             )
 
-            edge_thickness = max(1, int(3 * p1))
+            edge_thickness = proj.edge_thickness[i]
             pygame.draw.line(self.game.screen, self.road_edge_color, (l0, y0), (l1, y1), edge_thickness)
             pygame.draw.line(self.game.screen, self.road_edge_color, (r0, y0), (r1, y1), edge_thickness)
 
-            world0 = (-self.distance * 0.06) + (p0 * 60.0)
-            world1 = (-self.distance * 0.06) + (p1 * 60.0)
+            world0 = world_base + dash_phase[i]
+            world1 = world_base + dash_phase[i + 1]
 
-            def in_dash(w):
-                return (w % self.dash_cycle) < self.dash_len
-
-            if in_dash(world0) or in_dash(world1):
-                line_w = max(1, int(8 * p1))
-                pygame.draw.line(self.game.screen, self.center_line_color, (cx0, y0), (cx1, y1), line_w)
+            if (world0 % self.dash_cycle) < self.dash_len or (world1 % self.dash_cycle) < self.dash_len:
+                pygame.draw.line(self.game.screen, self.center_line_color, (cx0, y0), (cx1, y1), proj.line_widths[i])
 
     def draw_hud(self):
         if self.finished and self.finish_time_seconds is not None:
@@ -969,58 +1161,49 @@ class GameScene:
         self.game.screen.blit(txt_dist, (20, 76))
         self.game.screen.blit(txt_cp, (20, 108))
 
+        # live delta спрямо best ghost-а: кога ghost-ът е бил на моята distance
+        if not self.finished:
+            ghost_t = self.ghost.time_at_distance(self.distance)
+            if ghost_t is not None:
+                delta = t - ghost_t
+                txt_delta = self.hud_font.render(f"GHOST: {delta:+0.2f}s", True, self._delta_color(delta))
+                self.game.screen.blit(txt_delta, (20, 140))
+
+        # split при минаване на checkpoint
+        if self.split_flash is not None:
+            k, delta, until = self.split_flash
+            if t <= until:
+                line = f"CHECKPOINT {k + 1}/{len(self.checkpoints)}"
+                if delta is not None:
+                    line += f"  {delta:+0.3f}s"
+                color = self.hud_color if delta is None else self._delta_color(delta)
+                txt_split = self.hud_font.render(line, True, color)
+                self.game.screen.blit(txt_split, txt_split.get_rect(midtop=(self.screen_w // 2, 12)))
+
+    @staticmethod
+    def _delta_color(delta: float):
+        # отрицателно = пред ghost-а
+        return (40, 190, 80) if delta < 0 else (220, 60, 60)
+
     # ---------------- DRAW ----------------
 
     def draw(self):
+        view = self._frame_view()
+
         self.game.screen.fill(self.sky_color)
         self.game.screen.blit(self.horizon, (0, 0))
 
         self.draw_ground()
-        self.draw_road()
-        self.draw_finish_line()
+        self.draw_road(view)
 
-        # ghost draw (before obstacles)
+        # world sprites: един depth sort през всички системи + един blits
         run_t = self._run_time_seconds()
-
-        self.ghost.draw(
-            self.game.screen,
-            t=run_t,
-            player_distance=self.distance,
-            track_center_fn=lambda p: self.track.road_center_x(self.screen_w, self.distance, p),
-            top_y=self.road_top_y,
-            bottom_y=self.road_bottom_y,
-            gamma=self.gamma,
-            screen_w=self.screen_w,
-            screen_h=self.screen_h,
-            road_width_far=self.road_width_far,
-            road_width_near=self.road_width_near,
-        )
-
-        self.props.draw(
-            self.game.screen,
-            track_center_fn=lambda p: self.track.road_center_x(self.screen_w, self.distance, p),
-            top_y=self.road_top_y,
-            bottom_y=self.road_bottom_y,
-            gamma=self.gamma,
-            distance=self.distance,
-            screen_w=self.screen_w,
-            screen_h=self.screen_h,
-            road_width_far=self.road_width_far,
-            road_width_near=self.road_width_near,
-        )
-
-        self.obstacles.draw(
-            self.game.screen,
-            track_center_fn=lambda p: self.track.road_center_x(self.screen_w, self.distance, p),
-            top_y=self.road_top_y,
-            bottom_y=self.road_bottom_y,
-            gamma=self.gamma,
-            distance=self.distance,
-            screen_w=self.screen_w,
-            screen_h=self.screen_h,
-            road_width_far=self.road_width_far,
-            road_width_near=self.road_width_near,
-        )
+        world = self.world_sprites
+        self.collect_finish_line(world, view)
+        self.ghost_race.collect(world, t=run_t, view=view)
+        self.props.collect(world, view)
+        self.obstacles.collect(world, view)
+        world.flush(self.game.screen, world_clip(view))
 
         car_rect = self.car_image.get_rect(midbottom=(int(self.player_center_x), self.player_anchor_y))
         self.game.screen.blit(self.car_image, car_rect)
@@ -1,4 +1,5 @@
-from scenes.game import GameScene
+from scenes.game import unload_level_assets
+from scenes.loading import LoadingScene
 
 class LevelManager:
     def __init__(self, game):
@@ -6,7 +7,8 @@ class LevelManager:
         self.current_level = 1
 
     def next_level(self):
+        unload_level_assets(self.current_level)
         self.current_level += 1
         if self.current_level > 3:
             self.current_level = 1
-        self.game.current_scene = GameScene(self.game, self.current_level, self.current_level)
+        self.game.current_scene = LoadingScene(self.game, self.current_level, self.current_level)
@@ -2,6 +2,7 @@ import pygame
 import os
 import sys
 from settings1 import *
+from utils.asset_manager import ASSETS
 
 class LevelScene:
     def __init__(self, game, level_id, selected_car_id):
@@ -12,10 +13,9 @@ class LevelScene:
         base_path = os.path.dirname(os.path.dirname(__file__))  # scenes -> src
         img_path = os.path.join(base_path, f"../assets/Levels/level{level_id}_bg.jpg")
 
-        if os.path.exists(img_path):
-            self.bg = pygame.image.load(img_path).convert()
+        if ASSETS.exists(img_path):
             w, h = self.game.screen.get_size()
-            self.bg = pygame.transform.scale(self.bg, (w, h))
+            self.bg = ASSETS.image(img_path, size=(w, h), alpha=False, smooth=False)
         else:
             self.bg = pygame.Surface(self.game.screen.get_size())
             self.bg.fill((80, 80, 80))
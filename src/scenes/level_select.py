@@ -2,6 +2,8 @@ import pygame
 import os
 import sys
 from settings1 import *
+from utils.asset_manager import ASSETS
+from utils.profile_manager import top_times
 
 
 class LevelSelectionScene:
@@ -9,6 +11,10 @@ class LevelSelectionScene:
         self.game = game
         self.selected_car_id = selected_car_id
 
+        # level_id -> LoadJob, стартиран при hover върху картата
+        # (неизползваните се прибират в кеша от ASSETS.pump() в main loop-а)
+        self.preload_jobs = {}
+
         self.rebuild_layout()
 
     # ---------- LAYOUT ----------
@@ -50,15 +56,22 @@ class LevelSelectionScene:
             rect = pygame.Rect(start_x + i * (card_w + gap), y, card_w, card_h)
             img_path = os.path.join(levels_path, f"level{i+1}_bg.png")
             image = None
-            if os.path.exists(img_path):
-                image = pygame.image.load(img_path).convert()
-                image = pygame.transform.smoothscale(image, (card_w, card_h))
+            if ASSETS.exists(img_path):
+                image = ASSETS.image(img_path, size=(card_w, card_h), alpha=False)
             self.level_cards.append({
                 "id": i + 1,
                 "rect": rect,
                 "image": image,
+                "leader": self._leader_text(i + 1),
             })
 
+    def _leader_text(self, level_id):
+        top = top_times(level_id, limit=1)
+        if not top:
+            return None
+        username, best = top[0]
+        return f"BEST: {username}  {best:0.2f}s"
+
     # ---------- EVENTS ----------
 
     def handle_events(self):
@@ -80,6 +93,12 @@ class LevelSelectionScene:
                 self.game.current_scene = CarSelectionScene(self.game)
                 return
 
+            if event.type == pygame.MOUSEMOTION:
+                for card in self.level_cards:
+                    if card["rect"].collidepoint(event.pos):
+                        self._preload_level(card["id"])
+                continue
+
             if event.type == pygame.MOUSEBUTTONDOWN:
                 x, y = event.pos
 
@@ -93,16 +112,22 @@ class LevelSelectionScene:
                 for card in self.level_cards:
                     if card["rect"].collidepoint(x, y):
                         level_id = card["id"]
-                        # For now go to placeholder LevelScene; you can replace later
-                        from scenes.game import GameScene
-                        self.game.current_scene = GameScene(
+                        from scenes.loading import LoadingScene
+                        self.game.current_scene = LoadingScene(
                             self.game,
                             level_id,
-                            self.selected_car_id
+                            self.selected_car_id,
+                            job=self.preload_jobs.get(level_id),
                         )
 
                         return
 
+    def _preload_level(self, level_id):
+        if level_id in self.preload_jobs:
+            return
+        from scenes.game import preload_game
+        self.preload_jobs[level_id] = preload_game(self.game, level_id, self.selected_car_id)
+
     # ---------- DRAW ----------
 
     def draw(self):
@@ -134,3 +159,7 @@ class LevelSelectionScene:
                 pygame.draw.rect(self.game.screen, (200, 200, 200), rect)
                 txt = self.button_font.render(f"LEVEL {card['id']}", True, (0, 0, 0))
                 self.game.screen.blit(txt, txt.get_rect(center=rect.center))
+
+            if card["leader"]:
+                txt = self.button_font.render(card["leader"], True, (0, 0, 0))
+                self.game.screen.blit(txt, txt.get_rect(midtop=(rect.centerx, rect.bottom + 12)))
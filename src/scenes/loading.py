@@ -0,0 +1,62 @@
+import pygame
+import sys
+
+
+class LoadingScene:
+    """
+    Показва се докато assets на level-а се decode-ват/scale-ват във фонов thread pool
+    (+ mip нивата на sprite-овете и ghost данните). Продължава да pump-ва events,
+    а когато job-ът приключи, подава готовия GameScene на game.current_scene.
+    """
+    def __init__(self, game, level_id, selected_car_id, job=None):
+        self.game = game
+        self.level_id = level_id
+        self.selected_car_id = selected_car_id
+
+        from scenes.game import preload_game
+        if job is None:
+            job = preload_game(self.game, level_id, selected_car_id)
+        self.job = job
+
+        w, h = self.game.screen.get_size()
+        self.font = pygame.font.Font(None, 80)
+        self.small_font = pygame.font.Font(None, 36)
+
+        bar_w = int(w * 0.40)
+        self.bar = pygame.Rect((w - bar_w) // 2, int(h * 0.58), bar_w, 14)
+
+    def handle_events(self):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                sys.exit()
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                # назад; job-ът довършва във фона, а ASSETS.pump() (main loop) го прибира в кеша
+                from scenes.level_select import LevelSelectionScene
+                self.game.current_scene = LevelSelectionScene(self.game, self.selected_car_id)
+                return
+
+    def update(self):
+        if not self.job.done():
+            return
+
+        self.job.finish()
+
+        from scenes.game import GameScene
+        self.game.current_scene = GameScene(self.game, self.level_id, self.selected_car_id, preloaded=self.job.results)
+
+    def draw(self):
+        w, h = self.game.screen.get_size()
+        self.game.screen.fill((20, 20, 20))
+
+        txt = self.font.render(f"LEVEL {self.level_id}", True, (255, 255, 255))
+        self.game.screen.blit(txt, txt.get_rect(center=(w // 2, int(h * 0.45))))
+
+        hint = self.small_font.render("LOADING...", True, (200, 200, 200))
+        self.game.screen.blit(hint, hint.get_rect(center=(w // 2, self.bar.top - 30)))
+
+        pygame.draw.rect(self.game.screen, (80, 80, 80), self.bar, border_radius=7)
+        fill = self.bar.copy()
+        fill.width = int(self.bar.width * self.job.progress())
+        if fill.width > 0:
+            pygame.draw.rect(self.game.screen, (20, 140, 220), fill, border_radius=7)
@@ -7,6 +7,7 @@ from utils.profile_manager import save_profile
 from settings1 import *
 from utils.profile_manager import create_profile, load_profile
 from scenes.car_select import CarSelectionScene
+from utils.asset_manager import ASSETS
 
 class MenuScene:
     def __init__(self, game):
@@ -36,9 +37,8 @@ class MenuScene:
 
         # background
         img_path = os.path.join(self.assets_path, "Basic/menu_bg.png")
-        if os.path.exists(img_path):
-            self.bg = pygame.image.load(img_path).convert()
-            self.bg = pygame.transform.scale(self.bg, (w, h))
+        if ASSETS.exists(img_path):
+            self.bg = ASSETS.image(img_path, size=(w, h), alpha=False, smooth=False)
         else:
             self.bg = pygame.Surface((w, h))
             self.bg.fill((80, 80, 80))
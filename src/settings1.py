@@ -3,6 +3,19 @@ FPS = 60
 GAME_TITLE = "Lulin Drift"
 SAVE_FILE = "data/savegame.json"
 
+# Профили: "json" (data/players/<user>.json) или "sqlite" (data/players.db, за инсталации с много профили)
+PROFILE_BACKEND = "json"
+
+# Максимален брой ghosts в едно състезание (PB + last attempt + другите профили)
+GHOST_RACE_MAX = 8
+
+# Memory budget на SPRITE_CACHE (mip нива + scale-нати копия) в MB; над него се изхвърлят LRU копия
+SPRITE_CACHE_BUDGET_MB = 64
+
+# Decimation на ghost-а при save: (max грешка по distance, max грешка по lane); None = пази всички samples.
+# Lossy: напр. (0.5, 0.005) дава 840 -> 314 samples за data/ghosts/a/level_1.json при max ~0.48 грешка по distance.
+GHOST_SIMPLIFY_EPS = None
+
 # Car asset mapping
 CAR_ASSETS = {
     1: {
@@ -0,0 +1,60 @@
+# src/systems/draw_list.py
+
+from __future__ import annotations
+from typing import Iterable, List, Optional, Tuple
+import pygame
+
+
+def world_clip(view) -> pygame.Rect:
+    """Частта от екрана под хоризонта, където се рисуват world sprites."""
+    return pygame.Rect(0, view.top_y, view.screen_w, view.screen_h - view.top_y)
+
+
+class DrawList:
+    """
+    World-space sprites за един кадър (finish line, ghosts, props, obstacles).
+
+    Системите само добавят (dist_ahead, surface, dest); flush() сортира веднъж
+    по dist_ahead (далечните първи, painter's order) през всички системи и
+    подава всичко с един Surface.blits на layer.
+    """
+
+    def __init__(self):
+        self._keys: List[float] = []
+        self._blits: List[Tuple[pygame.Surface, pygame.Rect]] = []
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def clear(self) -> None:
+        self._keys.clear()
+        self._blits.clear()
+
+    def add(self, dist_ahead: float, surf: pygame.Surface, dest: pygame.Rect) -> None:
+        self._keys.append(dist_ahead)
+        self._blits.append((surf, dest))
+
+    def extend(self, dists: Iterable[float], surfs: Iterable[pygame.Surface], dests: Iterable[pygame.Rect]) -> None:
+        self._keys.extend(dists)
+        self._blits.extend(zip(surfs, dests))
+
+    def flush(self, screen: pygame.Surface, clip: Optional[pygame.Rect] = None) -> int:
+        """Рисува и изчиства списъка; връща броя sprites."""
+        n = len(self._keys)
+        if n:
+            # стабилен sort: при равни dist_ahead остава редът на добавяне
+            keys = self._keys
+            order = sorted(range(n), key=keys.__getitem__, reverse=True)
+            blits = self._blits
+            seq = [blits[i] for i in order]
+
+            if clip is not None:
+                old_clip = screen.get_clip()
+                screen.set_clip(clip)
+                screen.blits(seq, doreturn=False)
+                screen.set_clip(old_clip)
+            else:
+                screen.blits(seq, doreturn=False)
+
+        self.clear()
+        return n
@@ -0,0 +1,173 @@
+# src/systems/ghost_race.py
+
+from __future__ import annotations
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+import pygame
+
+from utils.ghost_file import GhostData
+from utils.sprite_cache import SPRITE_CACHE
+from systems.draw_list import DrawList
+
+
+class GhostRace:
+    """
+    Възпроизвежда много ghosts наведнъж (PB, други профили, last attempt).
+
+    Всички записи са конкатенирани в едни колони; за да стигне едно
+    np.searchsorted за всички ghosts, времето на ghost k се измества с
+    k * span (span > продължителността на всеки запис), така че отделните
+    записи остават сортирани един след друг.
+
+    Всеки ghost пази cursor към сегмента си от миналия кадър. Нормалният
+    playback мести cursor-ите с 0-1 sample на кадър (O(1)); само ghosts след
+    скок (respawn назад, restart, голям skip) минават през np.searchsorted.
+
+    На кадър: batch interpolate -> cull по view_depth -> векторна проекция
+    на видимите -> sprite-ове в общия DrawList (depth sort е там).
+    """
+
+    def __init__(
+        self,
+        *,
+        sprite_sets: Sequence[Dict[str, str]],
+        view_depth: float = 1200.0,
+        max_ghosts: int = 8,
+    ):
+        """
+        sprite_sets: style -> {"back"/"left"/"right": SPRITE_CACHE name}
+        (напр. style 0 = PB с по-плътен alpha, style 1 = останалите).
+        """
+        self.sprite_sets = list(sprite_sets)
+        self.view_depth = float(view_depth)
+        self.max_ghosts = int(max_ghosts)
+
+        self.labels: List[str] = []
+        self.count = 0
+        self._set_empty()
+
+    def _set_empty(self) -> None:
+        self.labels = []
+        self.count = 0
+        self._t = np.empty(0, dtype=np.float64)
+        self._t_off = np.empty(0, dtype=np.float64)
+        self._d = np.empty(0, dtype=np.float64)
+        self._lane = np.empty(0, dtype=np.float64)
+        self._dir = np.empty(0, dtype=np.int8)
+        self._first = np.empty(0, dtype=np.int64)
+        self._last = np.empty(0, dtype=np.int64)
+        self._t_first = np.empty(0, dtype=np.float64)
+        self._t_last = np.empty(0, dtype=np.float64)
+        self._offset = np.empty(0, dtype=np.float64)
+        self._style = np.empty(0, dtype=np.int64)
+        self._cur = np.empty(0, dtype=np.int64)
+
+    def set_ghosts(self, ghosts: Sequence[Tuple[str, GhostData, int]]) -> None:
+        """ghosts: (label, data, style); първите max_ghosts с >= 2 samples."""
+        usable = [(label, g, style) for label, g, style in ghosts if g is not None and len(g) >= 2]
+        usable = usable[: self.max_ghosts]
+        if not usable:
+            self._set_empty()
+            return
+
+        lengths = np.array([len(g) for _, g, _ in usable], dtype=np.int64)
+        first = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        last = first + lengths - 1
+
+        self._t = np.concatenate([np.asarray(g.t, dtype=np.float64) for _, g, _ in usable])
+        self._d = np.concatenate([np.asarray(g.d, dtype=np.float64) for _, g, _ in usable])
+        self._lane = np.concatenate([np.asarray(g.lane, dtype=np.float64) for _, g, _ in usable])
+        self._dir = np.concatenate([np.asarray(g.dir, dtype=np.int8) for _, g, _ in usable])
+
+        self._t_first = self._t[first]
+        self._t_last = self._t[last]
+        span = float(np.max(self._t_last - self._t_first)) + 1.0
+        self._offset = (np.arange(len(usable), dtype=np.float64) * span) - self._t_first
+        self._t_off = self._t + np.repeat(self._offset, lengths)
+
+        self._first = first
+        self._last = last
+        self._cur = first.copy()
+        self._style = np.array([style for _, _, style in usable], dtype=np.int64)
+        self.labels = [label for label, _, _ in usable]
+        self.count = len(usable)
+
+    # ---------- playback ----------
+
+    def positions(self, t: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(d, lane, dir) за всеки ghost в момент t - една векторна стъпка."""
+        tq = np.clip(float(t), self._t_first, self._t_last)
+
+        i = self._seek(tq + self._offset)
+        j = i + 1
+
+        ta = self._t[i]
+        tb = self._t[j]
+        dt = tb - ta
+        with np.errstate(divide="ignore", invalid="ignore"):
+            u = np.where(dt > 0.0, (tq - ta) / dt, 0.0)
+        u = np.clip(u, 0.0, 1.0)
+
+        da = self._d[i]
+        la = self._lane[i]
+        d = da + (self._d[j] - da) * u
+        lane = la + (self._lane[j] - la) * u
+        dir_val = np.where(u < 0.5, self._dir[i], self._dir[j])
+        return d, lane, dir_val
+
+    def _in_segment(self, i: np.ndarray, q: np.ndarray) -> np.ndarray:
+        """t_off[i] <= q < t_off[i + 1]; последният сегмент държи и q == края на записа."""
+        t_off = self._t_off
+        end = self._last - 1
+        return (t_off[i] <= q) & ((q < t_off[np.minimum(i + 1, self._last)]) | (i >= end))
+
+    def _seek(self, q: np.ndarray) -> np.ndarray:
+        """
+        Индекс на сегмента [i, i+1] вътре в собствения запис на всеки ghost
+        (q = изместеното време, вече clip-нато в записа).
+        """
+        i = self._cur
+        ok = self._in_segment(i, q)
+        if not ok.all():
+            # fast path: следващият sample
+            i = np.where(ok, i, np.minimum(i + 1, self._last - 1))
+            ok = self._in_segment(i, q)
+            if not ok.all():
+                miss = ~ok
+                j = np.searchsorted(self._t_off, q[miss], side="right") - 1
+                i[miss] = np.clip(j, self._first[miss], self._last[miss] - 1)
+        self._cur = i
+        return i
+
+    def collect(self, out: DrawList, *, t: float, view) -> int:
+        """Добавя видимите ghosts в кадровия DrawList; връща колко са."""
+        if not self.count:
+            return 0
+
+        d, lane, dir_val = self.positions(t)
+        dist_ahead = d - view.distance
+
+        visible = np.flatnonzero((dist_ahead > 0.0) & (dist_ahead <= self.view_depth))
+        if not len(visible):
+            return 0
+
+        depth = view.projection.depths_at(dist_ahead[visible], self.view_depth)  # 0..1
+        y, road_w, cx = view.points(depth)
+        road_half = road_w * 0.5
+        x = np.trunc(cx + lane[visible] * road_half * 0.92).astype(np.int64)
+        scale = 0.18 + (1.00 - 0.18) * depth
+
+        sets = self.sprite_sets
+        for k, dv, xi, yi, s, da in zip(
+            visible.tolist(),
+            dir_val[visible].tolist(),
+            x.tolist(),
+            y.tolist(),
+            scale.tolist(),
+            dist_ahead[visible].tolist(),
+        ):
+            kind = "left" if dv < 0 else "right" if dv > 0 else "back"
+            spr = SPRITE_CACHE.get(sets[int(self._style[k])][kind], s)
+            out.add(da, spr, spr.get_rect(midbottom=(xi, yi)))
+
+        return len(visible)
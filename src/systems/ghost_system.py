@@ -1,11 +1,26 @@
 # src/systems/ghost_system.py
 
 from __future__ import annotations
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Dict, List, Optional, Tuple
 import os
-import json
+import numpy as np
 import pygame
 
+from utils.ghost_simplify import simplify_indices
+from utils.ghost_file import (
+    GhostData,
+    GhostStream,
+    T_DTYPE,
+    DIR_DTYPE,
+    pack_rows,
+    read_ghost,
+    read_legacy_json,
+    write_ghost,
+)
+from utils.leaderboard_index import leaderboard
+from utils.sprite_cache import SPRITE_CACHE
+
 
 def lerp(a: float, b: float, t: float) -> float:
     return a + (b - a) * t
@@ -15,6 +30,271 @@ def clamp(v: float, a: float, b: float) -> float:
     return a if v < a else b if v > b else v
 
 
+def time_at_distance(t: np.ndarray, d_max: np.ndarray, distance: float) -> Optional[float]:
+    """
+    Първият момент, в който записът достига distance (интерполирано), по
+    running max-а на d (d не е монотонна - respawn връща назад).
+    None, ако distance е след последния sample.
+    """
+    n = len(d_max)
+    if n == 0:
+        return None
+    # query-то в dtype-а на колоната: иначе numpy cast-ва целия масив до float64 (O(n))
+    j = int(np.searchsorted(d_max, d_max.dtype.type(distance), side="left"))
+    if j <= 0:
+        return float(t[0])
+    if j >= n:
+        return None
+
+    da = float(d_max[j - 1])
+    db = float(d_max[j])
+    u = (distance - da) / (db - da) if db > da else 1.0
+    return lerp(float(t[j - 1]), float(t[j]), clamp(u, 0.0, 1.0))
+
+
+def ghost_sprite_names(sprite_key: str, alpha: int) -> Dict[str, str]:
+    """kind -> SPRITE_CACHE name за ghost sprite-овете на колата."""
+    # sprite_key идентифицира колата, alpha е част от името (различен ghost alpha -> различни копия)
+    return {kind: f"{sprite_key}:{kind}:a{int(alpha)}" for kind in ("back", "left", "right")}
+
+
+def register_ghost_sprites(
+    sprite_key: str,
+    alpha: int,
+    car_back: pygame.Surface,
+    car_left: pygame.Surface,
+    car_right: pygame.Surface,
+) -> Dict[str, str]:
+    """Регистрира полупрозрачните sprite-ове в SPRITE_CACHE; връща kind -> name."""
+    names = ghost_sprite_names(sprite_key, alpha)
+    for kind, base in (("back", car_back), ("left", car_left), ("right", car_right)):
+        SPRITE_CACHE.register(names[kind], base, alpha=int(alpha))
+    return names
+
+
+def load_best_ghost(base_dir: str, username: str, level: int) -> Optional[GhostData]:
+    """Чете level_N.ghost (или legacy level_N.json) на user-а, без да конвертира."""
+    user_dir = os.path.join(base_dir, username)
+    path = os.path.join(user_dir, f"level_{int(level)}.ghost")
+    legacy = os.path.join(user_dir, f"level_{int(level)}.json")
+    try:
+        if os.path.exists(path):
+            return read_ghost(path)
+        if os.path.exists(legacy):
+            return read_legacy_json(legacy)
+    except Exception:
+        pass
+    return None
+
+
+def load_player_ghost(base_dir: str, username: str, level: int, *, compress: bool = False) -> Optional[GhostData]:
+    """
+    Best ghost-ът на играча; legacy level_N.json се конвертира еднократно в
+    level_N.ghost (JSON-ът остава непипнат). Безопасно е от worker thread.
+    """
+    user_dir = os.path.join(base_dir, username)
+    path = os.path.join(user_dir, f"level_{int(level)}.ghost")
+    legacy = os.path.join(user_dir, f"level_{int(level)}.json")
+
+    try:
+        if os.path.exists(path):
+            return read_ghost(path)
+        if not os.path.exists(legacy):
+            return None
+        ghost = read_legacy_json(legacy)
+        if len(ghost) >= 2:
+            os.makedirs(user_dir, exist_ok=True)
+            write_ghost(
+                path,
+                username=ghost.username or username,
+                level=int(level),
+                best_time=ghost.best_time,
+                t=ghost.t,
+                d=ghost.d,
+                lane=ghost.lane,
+                dir=ghost.dir,
+                delta=compress,
+                compress=compress,
+            )
+        return ghost
+    except Exception:
+        return None
+
+
+_writer_pool: Optional[ThreadPoolExecutor] = None
+
+
+def _writer() -> ThreadPoolExecutor:
+    """Един общ writer thread: задачите (open/append/finish) се изпълняват по ред."""
+    global _writer_pool
+    if _writer_pool is None:
+        _writer_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ghost-writer")
+    return _writer_pool
+
+
+def shutdown_writer() -> None:
+    """Изчаква чакащите записи (best/last/abort) и спира writer thread-а (при изход)."""
+    global _writer_pool
+    if _writer_pool is not None:
+        _writer_pool.shutdown(wait=True)
+        _writer_pool = None
+
+
+class RunWriter:
+    """
+    Main-thread handle към GhostStream, който живее на writer thread-а.
+    Всички методи само submit-ват работа и не блокират.
+    """
+    def __init__(self, path: str, *, username: str, level: int):
+        self.path = path
+        self._stream: Future = _writer().submit(GhostStream, path, username=username, level=level)
+
+    def append(self, rows: bytes) -> None:
+        _writer().submit(self._append, rows)
+
+    def _append(self, rows: bytes) -> None:
+        self._stream.result().append(rows)
+
+    def finish_as(
+        self,
+        dst: str,
+        *,
+        best_time: Optional[float] = None,
+        simplify_eps: Optional[Tuple[float, float]] = None,
+        compress: bool = False,
+    ) -> Future:
+        """Затваря stream-а и го прави dst (rename); future-ът връща dst."""
+        return _writer().submit(self._finish_as, dst, best_time, simplify_eps, compress)
+
+    def _finish_as(self, dst, best_time, simplify_eps, compress) -> str:
+        stream = self._stream.result()
+        stream.finish(best_time)
+
+        if not simplify_eps and not compress:
+            os.replace(stream.path, dst)
+            return dst
+
+        # decimation/компресия: пренаписваме като колони (все още извън main thread-а)
+        g = read_ghost(stream.path, use_mmap=False)
+        t, d, lane, dir = g.t, g.d, g.lane, g.dir
+        if simplify_eps:
+            eps_d, eps_lane = simplify_eps
+            keep = simplify_indices(t, d, lane, dir, eps_d=eps_d, eps_lane=eps_lane)
+            t, d, lane, dir = t[keep], d[keep], lane[keep], dir[keep]
+        write_ghost(
+            dst,
+            username=g.username,
+            level=g.level,
+            best_time=best_time,
+            t=t,
+            d=d,
+            lane=lane,
+            dir=dir,
+            delta=compress,
+            compress=compress,
+        )
+        os.remove(stream.path)
+        return dst
+
+    def abort(self) -> None:
+        _writer().submit(self._abort)
+
+    def _abort(self) -> None:
+        try:
+            self._stream.result().abort()
+        except Exception:
+            pass
+
+
+def _note_best_ghost(fut: Future) -> None:
+    # изпълнява се на writer thread-а, след rename-а на level_N.ghost
+    if fut.exception() is not None:
+        print(f"[ghost] saving best failed: {fut.exception()}")
+        return
+    leaderboard().note_ghost(fut.result())
+
+
+def _note_last_attempt(fut: Future) -> None:
+    if fut.exception() is not None:
+        print(f"[ghost] saving last attempt failed: {fut.exception()}")
+
+
+class RecordBuffer:
+    """
+    float32/int8 колони за целия текущ run (вместо dict per sample; ~13 B/sample,
+    т.е. под 25 KB за минута на 30 Hz). GhostSystem праща на writer thread-а
+    само новите редове (rows(start)).
+
+    d_max (running max на d) се обновява при всеки append, затова
+    distance -> time индексът на live записа е готов по всяко време, без
+    повторно O(n) строене (time_at_distance() е O(log n)).
+    """
+    def __init__(self, capacity: int = 1024):
+        self.n = 0
+        self._alloc(max(16, int(capacity)))
+
+    def _alloc(self, capacity: int) -> None:
+        self.t = np.empty(capacity, dtype=T_DTYPE)
+        self.d = np.empty(capacity, dtype=T_DTYPE)
+        self.d_max = np.empty(capacity, dtype=T_DTYPE)
+        self.lane = np.empty(capacity, dtype=T_DTYPE)
+        self.dir = np.empty(capacity, dtype=DIR_DTYPE)
+
+    def _columns(self):
+        return self.t, self.d, self.d_max, self.lane, self.dir
+
+    @property
+    def capacity(self) -> int:
+        return len(self.t)
+
+    def __len__(self) -> int:
+        return self.n
+
+    def reserve(self, capacity: int) -> None:
+        if capacity <= self.capacity:
+            return
+        n = self.n
+        old = self._columns()
+        self._alloc(int(capacity))
+        for dst, src in zip(self._columns(), old):
+            dst[:n] = src[:n]
+
+    def append(self, t: float, d: float, lane: float, dir: int) -> None:
+        i = self.n
+        if i >= len(self.t):
+            self.reserve(len(self.t) * 2)
+        self.t[i] = t
+        self.d[i] = d
+        self.d_max[i] = d if i == 0 or d > self.d_max[i - 1] else self.d_max[i - 1]
+        self.lane[i] = lane
+        self.dir[i] = dir
+        self.n = i + 1
+
+    def clear(self) -> None:
+        self.n = 0
+
+    def columns(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Копия на записаното (буферът се преизползва при следващия run)."""
+        n = self.n
+        return self.t[:n].copy(), self.d[:n].copy(), self.lane[:n].copy(), self.dir[:n].copy()
+
+    def to_ghost(self, *, username: str, level: int, best_time: Optional[float] = None) -> Tuple[GhostData, np.ndarray]:
+        """Записаното като in-memory GhostData + копие на d_max индекса му."""
+        t, d, lane, dir = self.columns()
+        ghost = GhostData(username=username, level=level, best_time=best_time, t=t, d=d, lane=lane, dir=dir)
+        return ghost, self.d_max[:self.n].copy()
+
+    def rows(self, start: int = 0) -> bytes:
+        """Редовете [start, n) като packed редове (GhostStream формат)."""
+        n = self.n
+        return pack_rows(self.t[start:n], self.d[start:n], self.lane[start:n], self.dir[start:n])
+
+    def time_at_distance(self, distance: float) -> Optional[float]:
+        """Кога live run-ът е достигнал distance (None, ако още не е)."""
+        n = self.n
+        return time_at_distance(self.t[:n], self.d_max[:n], distance)
+
+
 class GhostSystem:
     """
     Записва и възпроизвежда ghost run (best time) за даден user + level.
@@ -26,6 +306,13 @@ class GhostSystem:
       - dir: -1/0/1 (sprite choice)
 
     Рисува ghost car в перспектива (като obstacle), използвайки dist_ahead = ghost_d - player_distance.
+
+    Файлът е binary (utils.ghost_file, level_N.ghost); стар level_N.json се
+    чете и се конвертира автоматично при първото зареждане.
+
+    Текущият run се stream-ва на batch-ове към level_N.run.tmp от фонов writer
+    thread. Нов best = finish + rename на този файл (без сериализация на
+    main thread-а); прекъснат run става level_N.last.ghost ("last attempt").
     """
 
     def __init__(
@@ -39,35 +326,45 @@ class GhostSystem:
         car_right: pygame.Surface,
         enabled: bool = True,
         sample_dt: float = 1.0 / 30.0,
-        view_depth: float = 1200.0,
         alpha: int = 120,
+        sprite_key: str = "ghost",
+        compress: bool = False,
+        batch_size: int = 256,
+        simplify_eps: Optional[Tuple[float, float]] = None,
+        best: Optional[GhostData] = None,
     ):
+        """best: вече зареден best ghost (load_player_ghost във фоновия job); иначе се чете тук."""
         self.enabled = enabled
         self.base_dir = base_dir
         self.username = username or "Player"
         self.level = int(level)
 
         self.sample_dt = float(sample_dt)
-        self.view_depth = float(view_depth)
-        self.alpha = int(alpha)
-
-        self.car_back = car_back
-        self.car_left = car_left
-        self.car_right = car_right
+        self.compress = bool(compress)  # delta + zlib (по-малък файл, но без mmap playback)
+        self.simplify_eps = simplify_eps  # (eps_d, eps_lane) за decimation при save; None = raw 30 Hz
 
-        self._scale_cache: Dict[Tuple[str, int], pygame.Surface] = {}
-        self._record: List[dict] = []
+        self.sprite_names = register_ghost_sprites(sprite_key, alpha, car_back, car_left, car_right)
+        self.batch_size = max(1, int(batch_size))  # samples на един append към writer-а
+        self._record = RecordBuffer(4 * self.batch_size)
+        self._flushed = 0  # колко реда от _record вече са пратени на writer-а
         self._accum = 0.0
 
-        self._ghost_data: Optional[dict] = None
-        self._samples: List[dict] = []
-        self._play_i = 0
+        self._run: Optional[RunWriter] = None
+        self._run_count = 0  # samples в текущия run
+        self._saved = False  # текущият run вече е записан като best
+        self._last: Optional[GhostData] = None
+
+        self._ghost: Optional[GhostData] = None
+        self._d_max: Optional[np.ndarray] = None  # running max на d за търсене по distance
 
         if not self.enabled:
             return
 
         os.makedirs(self._user_dir(), exist_ok=True)
-        self._load_if_exists()
+        if best is not None:
+            self._set_ghost(best)
+        else:
+            self._load_if_exists()
 
     # ---------- paths ----------
 
@@ -75,70 +372,107 @@ class GhostSystem:
         return os.path.join(self.base_dir, self.username)
 
     def _ghost_path(self) -> str:
-        return os.path.join(self._user_dir(), f"level_{self.level}.json")
+        return os.path.join(self._user_dir(), f"level_{self.level}.ghost")
+
+    def _run_path(self) -> str:
+        return os.path.join(self._user_dir(), f"level_{self.level}.run.tmp")
+
+    def _last_path(self) -> str:
+        return os.path.join(self._user_dir(), f"level_{self.level}.last.ghost")
 
     # ---------- load/save ----------
 
+    def _set_ghost(self, ghost: Optional[GhostData], d_max: Optional[np.ndarray] = None) -> None:
+        if self._ghost is not None and self._ghost is not ghost:
+            self._ghost.close()
+        if ghost is not None and len(ghost) < 2:
+            ghost.close()
+            ghost = None
+        self._ghost = ghost
+        # monotonic distance -> time индекс (running max на d), строи се веднъж при load
+        # (за току-що записан run идва готов от RecordBuffer)
+        if ghost is None:
+            self._d_max = None
+        elif d_max is not None:
+            self._d_max = d_max
+        else:
+            self._d_max = np.maximum.accumulate(ghost.d)
+
     def _load_if_exists(self) -> None:
-        path = self._ghost_path()
-        if not os.path.exists(path):
-            self._ghost_data = None
-            self._samples = []
-            return
+        self._set_ghost(load_player_ghost(self.base_dir, self.username, self.level, compress=self.compress))
 
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            samples = data.get("samples", [])
-            if not isinstance(samples, list) or len(samples) < 2:
-                self._ghost_data = None
-                self._samples = []
-                return
-
-            self._ghost_data = data
-            self._samples = samples
-            self._play_i = 0
-        except Exception:
-            self._ghost_data = None
-            self._samples = []
+    def _run_ghost(self, best_time: Optional[float] = None) -> Tuple[GhostData, np.ndarray]:
+        return self._record.to_ghost(username=self.username, level=self.level, best_time=best_time)
 
     def save_recording_as_best(self, finish_time: float) -> None:
-        if not self.enabled or len(self._record) < 2:
+        """
+        Не блокира: новият best се ползва директно от паметта (RecordBuffer),
+        а writer thread-ът довършва stream-а и го rename-ва на level_N.ghost.
+        """
+        if not self.enabled or self._run is None or self._run_count < 2:
             return
 
-        data = {
-            "version": 1,
-            "username": self.username,
-            "level": self.level,
-            "best_time": round(float(finish_time), 3),
-            "samples": self._record,
-        }
-
-        path = self._ghost_path()
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
-
-        # Immediately load it for instant replay on restart
-        self._ghost_data = data
-        self._samples = data["samples"]
-        self._play_i = 0
-
-    def get_best_time(self) -> Optional[float]:
-        if not self._ghost_data:
-            return None
-        bt = self._ghost_data.get("best_time")
-        try:
-            return float(bt)
-        except Exception:
-            return None
+        self._flush()
+        best_time = round(float(finish_time), 3)
+
+        # старият mapping се затваря тук (в _set_ghost), преди файлът да се презапише
+        self._set_ghost(*self._run_ghost(best_time))
+        fut = self._run.finish_as(
+            self._ghost_path(),
+            best_time=best_time,
+            simplify_eps=self.simplify_eps,
+            compress=self.compress,
+        )
+        fut.add_done_callback(_note_best_ghost)
+        self._run = None
+        self._saved = True
+
+    @property
+    def best(self) -> Optional[GhostData]:
+        return self._ghost
+
+    @property
+    def last_attempt(self) -> Optional[GhostData]:
+        """Последният прекъснат/незапазен run от тази сесия (или None)."""
+        return self._last
 
     # ---------- recording ----------
 
     def start_run(self) -> None:
-        self._record = []
+        if not self.enabled:
+            return
+
+        # предишният run: ако не е станал best, остава като "last attempt"
+        if self._run is not None:
+            if self._run_count >= 2 and not self._saved:
+                self._flush()
+                # ghost-ът е от паметта; файлът е само за следващата сесия
+                self._last, _ = self._run_ghost()
+                self._run.finish_as(self._last_path()).add_done_callback(_note_last_attempt)
+            else:
+                self._run.abort()
+
+        self._record.clear()
+        self._flushed = 0
+        self._run = RunWriter(self._run_path(), username=self.username, level=self.level)
+        self._run_count = 0
+        self._saved = False
         self._accum = 0.0
-        self._play_i = 0
+
+    def abort_run(self) -> None:
+        """Изоставен run (изход от scene-а): затваря stream-а и трие level_N.run.tmp."""
+        if self._run is not None:
+            self._run.abort()
+            self._run = None
+        self._record.clear()
+        self._flushed = 0
+        self._run_count = 0
+
+    def _flush(self) -> None:
+        n = self._record.n
+        if n > self._flushed and self._run is not None:
+            self._run.append(self._record.rows(self._flushed))
+        self._flushed = n
 
     def record(
         self,
@@ -163,123 +497,35 @@ class GhostSystem:
         lane = clamp(float(lane), -1.0, 1.0)
         dir = -1 if dir < 0 else 1 if dir > 0 else 0
 
-        self._record.append({
-            "t": round(float(t), 3),
-            "d": round(float(distance), 3),
-            "lane": round(lane, 4),
-            "dir": dir,
-        })
-
-    # ---------- playback ----------
-
-    def _sample_at_time(self, t: float) -> Optional[dict]:
-        if not self._samples:
-            return None
-
-        if t <= self._samples[0]["t"]:
-            return self._samples[0]
-        if t >= self._samples[-1]["t"]:
-            return self._samples[-1]
-
-        # advance pointer
-        while self._play_i + 1 < len(self._samples) and self._samples[self._play_i + 1]["t"] <= t:
-            self._play_i += 1
-
-        a = self._samples[self._play_i]
-        b = self._samples[self._play_i + 1]
-
-        ta = float(a["t"])
-        tb = float(b["t"])
-        if tb <= ta:
-            return a
-
-        u = (t - ta) / (tb - ta)
-        u = clamp(u, 0.0, 1.0)
-
-        d = lerp(float(a["d"]), float(b["d"]), u)
-        lane = lerp(float(a["lane"]), float(b["lane"]), u)
-
-        # dir: take closer one
-        dir_val = a.get("dir", 0) if u < 0.5 else b.get("dir", 0)
-        dir_val = -1 if dir_val < 0 else 1 if dir_val > 0 else 0
-
-        return {"t": t, "d": d, "lane": lane, "dir": dir_val}
-
-    def _scaled_sprite(self, kind: str, base: pygame.Surface, scale: float) -> pygame.Surface:
-        key = (kind, int(scale * 100))
-        if key in self._scale_cache:
-            return self._scale_cache[key]
-
-        w = max(1, int(base.get_width() * scale))
-        h = max(1, int(base.get_height() * scale))
-        spr = pygame.transform.smoothscale(base, (w, h)).convert_alpha()
-        spr.set_alpha(self.alpha)
-        self._scale_cache[key] = spr
-        return spr
-
-    def draw(
-        self,
-        screen: pygame.Surface,
-        *,
-        t: float,
-        player_distance: float,
-        track_center_fn,
-        top_y: int,
-        bottom_y: int,
-        gamma: float,
-        screen_w: int,
-        screen_h: int,
-        road_width_far: float,
-        road_width_near: float,
-    ) -> None:
-        if not self.enabled or not self._samples:
-            return
-
-        s = self._sample_at_time(float(t))
-        if not s:
-            return
-
-        ghost_d = float(s["d"])
-        lane = float(s["lane"])
-        dir_val = int(s.get("dir", 0))
-
-        dist_ahead = ghost_d - float(player_distance)
-
-        # If ghost is behind camera, you can skip it (cleaner)
-        if dist_ahead <= 0:
+        if self._run is None:
             return
 
-        if dist_ahead > self.view_depth:
-            return
-
-        height = bottom_y - top_y
-
-        # same perspective mapping as obstacles
-        tt = dist_ahead / self.view_depth
-        z_screen = 1.0 - tt
-        depth = (z_screen ** float(gamma))  # 0..1
+        self._record.append(t, distance, lane, dir)
+        self._run_count += 1
+        if self._record.n - self._flushed >= self.batch_size:
+            self._flush()
 
-        y = int(top_y + depth * height)
-
-        road_w = int(lerp(float(road_width_far), float(road_width_near), depth) * screen_w)
-        road_half = road_w * 0.5
-
-        cx = int(track_center_fn(depth))
-        x = int(cx + lane * road_half * 0.92)
+    # ---------- playback ----------
 
-        # choose sprite
-        base = self.car_back
-        kind = "back"
-        if dir_val < 0:
-            base = self.car_left
-            kind = "left"
-        elif dir_val > 0:
-            base = self.car_right
-            kind = "right"
+    def time_at_distance(self, distance: float) -> Optional[float]:
+        """
+        Първият момент, в който ghost-ът достига distance (интерполирано).
+        d не е монотонна (respawn връща назад) -> търси се в running max-а ѝ.
+        След последния sample (финала) връща финалното време на ghost-а.
+        """
+        g = self._ghost
+        if g is None:
+            return None
 
-        # scale by depth
-        scale = lerp(0.18, 1.00, depth)
-        spr = self._scaled_sprite(kind, base, scale)
+        t = time_at_distance(g.t, self._d_max, distance)
+        if t is None:
+            # последният sample е малко преди финала (последния checkpoint = track.length)
+            # -> best ghost-ът е завършен run, времето там е финалното
+            return float(g.best_time) if g.best_time is not None else float(g.t[len(g) - 1])
+        return t
 
-        rect = spr.get_rect(midbottom=(x, y))
-        screen.blit(spr, rect)
+    def times_at_distances(self, distances) -> Optional[List[Optional[float]]]:
+        """time_at_distance за няколко точки (напр. checkpoint splits на ghost-а)."""
+        if self._ghost is None:
+            return None
+        return [self.time_at_distance(float(d)) for d in distances]
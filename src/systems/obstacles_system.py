@@ -1,12 +1,15 @@
 from __future__ import annotations
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Optional
 import os
 import random
+import numpy as np
 import pygame
 
-
-def lerp(a: float, b: float, t: float) -> float:
-    return a + (b - a) * t
+from utils.asset_manager import ASSETS
+from utils.sprite_cache import SPRITE_CACHE
+from utils.chunk_stream import ChunkStream
+from utils.z_index import ZIndex
+from systems.draw_list import DrawList
 
 
 class ObstaclesSystem:
@@ -27,6 +30,9 @@ class ObstaclesSystem:
         lane_width: float = 0.62,   # how much of the road width obstacles can use (0..1)
         collision_window: float = 90.0,
         names: Optional[List[str]] = None,
+        asset_group: Optional[str] = None,
+        chunk_length: float = 1500.0,
+        keep_behind: float = 600.0,
     ):
 
 
@@ -37,9 +43,11 @@ class ObstaclesSystem:
         self.lane_width = float(lane_width)
 
         self.images: Dict[str, pygame.Surface] = {}
-        self._cache: Dict[Tuple[str, int], pygame.Surface] = {}
+        self._sprite_names: Dict[str, str] = {}  # kind -> SPRITE_CACHE name
 
-        self.obstacles: List[dict] = []
+        self.min_gap = float(min_gap)
+        self._kinds: List[str] = []  # колоната "kind" е индекс тук (SPRITE_CACHE names)
+        self.stream: Optional[ChunkStream] = None
 
         if not enabled:
             return
@@ -63,116 +71,97 @@ class ObstaclesSystem:
         for name in load_names:
             for d in search_dirs:
                 path = os.path.join(d, f"{name}.png")
-                if os.path.exists(path) and name not in self.images:
-                    self.images[name] = pygame.image.load(path).convert_alpha()
+                if ASSETS.exists(path) and name not in self.images:
+                    sprite_name = ASSETS.asset_name(path)
+                    img = ASSETS.image(path, group=asset_group)
+                    SPRITE_CACHE.register(sprite_name, img)
+                    self.images[name] = img
+                    self._sprite_names[name] = sprite_name
                     break
 
         if not self.images:
             self.enabled = False
             return
 
-        rng = random.Random(seed)
-        kinds = list(self.images.keys())
-
-        # Spawn z positions with min spacing, within track
-        z_list: List[float] = []
-        attempts = 0
-        while len(z_list) < count and attempts < count * 50:
-            attempts += 1
-            safe_start = 900.0  # няма препятствия в първите 900 units
-            safe_end_margin = 600.0
-            z = rng.uniform(safe_start, max(safe_start + 300.0, self.track_length - safe_end_margin))
-
-            if all(abs(z - other) >= min_gap for other in z_list):
-                z_list.append(z)
-
-        z_list.sort()
-
-        for z in z_list:
-            kind = rng.choice(kinds)
+        self._kinds = [self._sprite_names[k] for k in self.images.keys()]
+
+        safe_start = 900.0  # няма препятствия в първите 900 units
+        safe_end_margin = 600.0
+        self.stream = ChunkStream(
+            seed=seed,
+            z_start=safe_start,
+            z_end=max(safe_start + 300.0, self.track_length - safe_end_margin),
+            count=count,
+            generate=self._generate_chunk,
+            gap=self.min_gap,  # z-тата се поставят с min gap, точно count когато се събират
+            chunk_length=chunk_length,
+            keep_behind=keep_behind,
+        )
+        if not self.stream.feasible:
+            print(
+                f"[obstacles] {count} obstacles with min_gap {self.min_gap:g} do not fit in "
+                f"[{self.stream.z_start:g}, {self.stream.z_end:g}]; placing {self.stream.count}"
+            )
+
+    @property
+    def obstacles(self) -> ZIndex:
+        """Генерираните в момента obstacles (само chunk-овете около играча)."""
+        return self.stream.index if self.stream is not None else ZIndex()
+
+    def _generate_chunk(self, rng: random.Random, z: np.ndarray):
+        n = len(z)
+        kind = np.empty(n, dtype=np.int16)
+        lane_offset = np.empty(n, dtype=np.float64)
+        for i in range(n):
+            kind[i] = rng.randrange(len(self._kinds))
             # избирай от 5 "ленти", за да има логични пролуки
             lanes = [-0.75, -0.35, 0.0, 0.35, 0.75]
-            lane_offset = rng.choice(lanes) * self.lane_width
+            lane_offset[i] = rng.choice(lanes) * self.lane_width
 
-            self.obstacles.append({
-                "kind": kind,
-                "z": z,
-                "lane_offset": lane_offset,
-            })
+        return {"kind": kind, "lane_offset": lane_offset}
 
-        self.obstacles.sort(key=lambda o: o["z"], reverse=True)
+    def reset(self) -> None:
+        """Restores obstacle positions for a new run (chunk-овете се генерират наново, същият layout)."""
+        if self.stream is not None:
+            self.stream.reset()
 
-    def _scaled(self, kind: str, scale: float) -> pygame.Surface:
-        key = (kind, int(scale * 100))
-        if key in self._cache:
-            return self._cache[key]
+    def _project(self, lo: int, hi: int, view):
+        """Screen x, y и sprite scale за obstacles[lo:hi] - една векторна стъпка."""
+        obs = self.obstacles
+        depth = view.projection.depths_at(obs.z[lo:hi] - view.distance, self.view_depth)
+        y, road_w, cx = view.points(depth)
+        road_half = road_w * 0.5
 
-        img = self.images[kind]
-        w = max(1, int(img.get_width() * scale))
-        h = max(1, int(img.get_height() * scale))
-        surf = pygame.transform.smoothscale(img, (w, h))
-        self._cache[key] = surf
-        return surf
+        x = np.trunc(cx + obs["lane_offset"][lo:hi] * road_half).astype(np.int64)
+        scale = 0.12 + (1.15 - 0.12) * depth
+        return x, y, scale
 
-    def draw(
-        self,
-        screen: pygame.Surface,
-        *,
-        track_center_fn,
-        top_y: int,
-        bottom_y: int,
-        gamma: float,
-        distance: float,
-        screen_w: int,
-        screen_h: int,
-        road_width_far: float,
-        road_width_near: float,
-    ):
+    def collect(self, out: DrawList, view) -> None:
+        """Добавя видимите obstacles в кадровия DrawList (sort/blit/clip са там)."""
         if not self.enabled:
             return
 
-        height = bottom_y - top_y
-
-        clip_rect = pygame.Rect(0, top_y, screen_w, screen_h - top_y)
-        old_clip = screen.get_clip()
-        screen.set_clip(clip_rect)
+        distance = view.distance
 
-        for ob in self.obstacles:
-            dist_ahead = ob["z"] - distance
-            if dist_ahead < 0 or dist_ahead > self.view_depth:
-                continue
+        self.stream.update(distance, self.view_depth)
 
-            t = dist_ahead / self.view_depth
-            z_screen = 1.0 - t
-            depth = z_screen ** gamma
-
-            y = int(top_y + depth * height)
-
-            road_w = int(lerp(road_width_far, road_width_near, depth) * screen_w)
-            road_half = road_w * 0.5
-
-            cx = track_center_fn(depth)
-            x = int(cx + ob["lane_offset"] * road_half)
+        # само прозорецът [distance, distance + view_depth]
+        lo, hi = self.obstacles.window(distance, distance + self.view_depth)
+        if hi <= lo:
+            return
 
-            scale = lerp(0.12, 1.15, depth)
-            spr = self._scaled(ob["kind"], scale)
-            rect = spr.get_rect(midbottom=(x, y))
-            screen.blit(spr, rect)
+        x, y, scale = self._project(lo, hi, view)
+        kinds = self._kinds
+        sprs = [SPRITE_CACHE.get(kinds[k], s) for k, s in zip(self.obstacles["kind"][lo:hi].tolist(), scale.tolist())]
+        rects = [spr.get_rect(midbottom=p) for spr, p in zip(sprs, zip(x.tolist(), y.tolist()))]
+        out.extend((self.obstacles.z[lo:hi] - distance).tolist(), sprs, rects)
 
-        screen.set_clip(old_clip)
 
     def check_hit(
         self,
         *,
         car_rect: pygame.Rect,
-        track_center_fn,
-        top_y: int,
-        bottom_y: int,
-        gamma: float,
-        distance: float,
-        screen_w: int,
-        road_width_far: float,
-        road_width_near: float,
+        view,
     ) -> bool:
         """
         Screen-space collision near the player.
@@ -181,36 +170,31 @@ class ObstaclesSystem:
         if not self.enabled:
             return False
 
-        height = bottom_y - top_y
+        distance = view.distance
 
-        # check only obstacles close to camera
-        for ob in self.obstacles:
-            dist_ahead = ob["z"] - distance
-            if dist_ahead < 0 or dist_ahead > self.collision_window:
-                continue
+        self.stream.update(distance, self.view_depth)
 
-            t = dist_ahead / self.view_depth
-            z_screen = 1.0 - t
-            depth = z_screen ** gamma
-
-            y = int(top_y + depth * height)
-
-            road_w = int(lerp(road_width_far, road_width_near, depth) * screen_w)
-            road_half = road_w * 0.5
+        # check only obstacles close to camera
+        lo, hi = self.obstacles.window(distance, distance + self.collision_window)
+        if hi <= lo:
+            return False
 
-            cx = track_center_fn(depth)
-            x = int(cx + ob["lane_offset"] * road_half)
+        x, y, scale = self._project(lo, hi, view)
+        kinds = self.obstacles["kind"]
 
-            scale = lerp(0.12, 1.15, depth)
-            spr = self._scaled(ob["kind"], scale)
-            ob_rect = spr.get_rect(midbottom=(x, y))
+        #car hitboxes
+        car_hit = car_rect.inflate(-car_rect.width * 0.35, -car_rect.height * 0.35)
 
-            #car hitboxes
-            car_hit = car_rect.inflate(-car_rect.width * 0.35, -car_rect.height * 0.35)
+        # far -> near, както draw
+        for j in range(hi - lo - 1, -1, -1):
+            spr = SPRITE_CACHE.get(self._kinds[int(kinds[lo + j])], float(scale[j]))
+            ob_rect = spr.get_rect(midbottom=(int(x[j]), int(y[j])))
             ob_hit = ob_rect.inflate(-ob_rect.width * 0.40, -ob_rect.height * 0.40)
 
             if ob_hit.colliderect(car_hit):
-                ob["z"] = min(self.track_length - 300.0, ob["z"] + 700.0)
+                # move() пренарежда колоните, иначе z сортът се чупи
+                i = lo + j
+                self.obstacles.move(i, min(self.track_length - 300.0, float(self.obstacles.z[i]) + 700.0))
                 return True
 
         return False
@@ -2,16 +2,21 @@
 from __future__ import annotations
 import os
 import random
+import numpy as np
 import pygame
-from typing import Dict, List, Tuple, Optional
-
-def lerp(a: float, b: float, t: float) -> float:
-    return a + (b - a) * t
+from typing import Dict, List, Optional
 
+from utils.asset_manager import ASSETS
+from utils.sprite_cache import SPRITE_CACHE
+from utils.chunk_stream import ChunkStream
+from utils.z_index import ZIndex
+from systems.draw_list import DrawList
 
 class PropsSystem:
     """
     Рисува roadside props (bush/rock) по детерминистичен seed.
+    Props-ите се генерират lazy по chunk-ове (виж ChunkStream), така че
+    паметта и startup-ът не зависят от дължината на трасето.
     """
     def __init__(
         self,
@@ -24,20 +29,24 @@ class PropsSystem:
         count: int = 22,
         names: Optional[List[str]] = None,
         weights: Optional[Dict[str, float]] = None,
+        asset_group: Optional[str] = None,
+        chunk_length: float = 1500.0,
+        keep_behind: float = 600.0,
     ):
         self.enabled = enabled
         self.view_depth = float(view_depth)
         self.world_length = float(world_length)
 
         self.prop_images: Dict[str, pygame.Surface] = {}
-        self._cache: Dict[Tuple[str, int], pygame.Surface] = {}
-        self.props: List[dict] = []
+        self._sprite_names: Dict[str, str] = {}  # kind -> SPRITE_CACHE name
+        self._kinds: List[str] = []  # колоната "kind" е индекс тук
+        self.stream: Optional[ChunkStream] = None
 
         if not enabled:
             return
 
         props_dir = os.path.join(level_path, "props")
-        if not os.path.isdir(props_dir):
+        if not ASSETS.isdir(props_dir):
             self.enabled = False
             return
 
@@ -46,96 +55,86 @@ class PropsSystem:
 
         for name in load_names:
             pth = os.path.join(props_dir, f"{name}.png")
-            if os.path.exists(pth):
-                self.prop_images[name] = pygame.image.load(pth).convert_alpha()
+            if ASSETS.exists(pth):
+                sprite_name = ASSETS.asset_name(pth)
+                img = ASSETS.image(pth, group=asset_group)
+                SPRITE_CACHE.register(sprite_name, img)
+                self.prop_images[name] = img
+                self._sprite_names[name] = sprite_name
 
         if not self.prop_images:
             self.enabled = False
             return
 
-        rng = random.Random(seed)
         kinds = list(self.prop_images.keys())
 
         w_map = weights or {}
-        w_list = [float(w_map.get(k, 1.0)) for k in kinds]
-
-        for _ in range(count):
-            z = rng.uniform(150.0, max(200.0, self.world_length - 50.0))
-            kind = rng.choices(kinds, weights=w_list, k=1)[0]
-            side = rng.choice([-1, 1])
-            spread = rng.random()
-            self.props.append({"kind": kind, "side": side, "spread": spread, "z": z})
-
-        # far -> near за правилен draw order
-        self.props.sort(key=lambda p: p["z"], reverse=True)
-
-    def _scaled(self, kind: str, scale: float) -> pygame.Surface:
-        key = (kind, int(scale * 100))
-        if key in self._cache:
-            return self._cache[key]
-
-        img = self.prop_images[kind]
-        w = max(1, int(img.get_width() * scale))
-        h = max(1, int(img.get_height() * scale))
-        surf = pygame.transform.smoothscale(img, (w, h))
-        self._cache[key] = surf
-        return surf
-
-    def draw(
-            self,
-            screen: pygame.Surface,
-            *,
-            track_center_fn,
-            top_y: int,
-            bottom_y: int,
-            gamma: float,
-            distance: float,
-            screen_w: int,
-            screen_h: int,
-            road_width_far: float,
-            road_width_near: float,
-    ):
+        self._weights = [float(w_map.get(k, 1.0)) for k in kinds]
+        self._kinds = [self._sprite_names[k] for k in kinds]
+
+        self.stream = ChunkStream(
+            seed=seed,
+            z_start=150.0,
+            z_end=max(200.0, self.world_length - 50.0),
+            count=count,
+            generate=self._generate_chunk,
+            chunk_length=chunk_length,
+            keep_behind=keep_behind,
+        )
+
+    @property
+    def props(self) -> ZIndex:
+        """Генерираните в момента props (само chunk-овете около играча)."""
+        return self.stream.index if self.stream is not None else ZIndex()
+
+    def _generate_chunk(self, rng: random.Random, z: np.ndarray):
+        n = len(z)
+        kind_ids = range(len(self._kinds))
+        kind = np.empty(n, dtype=np.int16)
+        side = np.empty(n, dtype=np.int8)
+        spread = np.empty(n, dtype=np.float64)
+        for i in range(n):
+            kind[i] = rng.choices(kind_ids, weights=self._weights, k=1)[0]
+            side[i] = rng.choice([-1, 1])
+            spread[i] = rng.random()
+        return {"kind": kind, "side": side, "spread": spread}
+
+    def collect(self, out: DrawList, view) -> None:
+        """Добавя видимите props в кадровия DrawList (sort/blit/clip са там)."""
         if not self.enabled:
             return
 
-        height = bottom_y - top_y
-
-        clip_rect = pygame.Rect(0, top_y, screen_w, screen_h - top_y)
-        old_clip = screen.get_clip()
-        screen.set_clip(clip_rect)
-
-        for p in self.props:
-            dist_ahead = p["z"] - distance
-            if dist_ahead < 0 or dist_ahead > self.view_depth:
-                continue
-
-            t = dist_ahead / self.view_depth
-            z_screen = 1.0 - t
-            depth = z_screen ** gamma
-
-            y = int(top_y + depth * height)
+        screen_w = view.screen_w
+        distance = view.distance
 
-            road_w = int(lerp(road_width_far, road_width_near, depth) * screen_w)
-            road_half = road_w / 2
-            cx = track_center_fn(depth)
+        self.stream.update(distance, self.view_depth)
+        props = self.stream.index
 
-            # -------- spread по целия бекграунд --------
-            margin = 12
-            max_extra = (screen_w * 0.5) - road_half - margin  # до ръба на екрана
-            if max_extra <= 5:
-                continue
-
-            min_extra = 10  # колко минимум “извън пътя”
-            extra = lerp(min_extra, max_extra, p.get("spread", 0.0))
-
-            #далечината:
-            extra *= (0.35 + 0.65 * depth)
-
-            x = int(cx + p["side"] * (road_half + extra))
-
-            scale = lerp(0.10, 1.05, depth)
-            spr = self._scaled(p["kind"], scale)
-            rect = spr.get_rect(midbottom=(x, y))
-            screen.blit(spr, rect)
+        # само прозорецът [distance, distance + view_depth], проекцията е една векторна стъпка
+        lo, hi = props.window(distance, distance + self.view_depth)
+        if hi <= lo:
+            return
 
-        screen.set_clip(old_clip)
\ No newline at end of file
+        dist_ahead = props.z[lo:hi] - distance
+        depth = view.projection.depths_at(dist_ahead, self.view_depth)
+        y, road_w, cx = view.points(depth)
+        road_half = road_w / 2
+
+        # -------- spread по целия бекграунд --------
+        margin = 12
+        max_extra = (screen_w * 0.5) - road_half - margin  # до ръба на екрана
+        min_extra = 10  # колко минимум “извън пътя”
+        extra = min_extra + (max_extra - min_extra) * props["spread"][lo:hi]
+
+        #далечината:
+        extra *= (0.35 + 0.65 * depth)
+
+        x = np.trunc(cx + props["side"][lo:hi] * (road_half + extra)).astype(np.int64)
+        scale = 0.10 + (1.05 - 0.10) * depth
+
+        # без място извън пътя -> не се рисува
+        keep = np.flatnonzero(max_extra > 5)
+        kinds = self._kinds
+        sprs = [SPRITE_CACHE.get(kinds[k], s) for k, s in zip(props["kind"][lo:hi][keep].tolist(), scale[keep].tolist())]
+        rects = [spr.get_rect(midbottom=p) for spr, p in zip(sprs, zip(x[keep].tolist(), y[keep].tolist()))]
+        out.extend(dist_ahead[keep].tolist(), sprs, rects)
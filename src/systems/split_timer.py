@@ -0,0 +1,61 @@
+# src/systems/split_timer.py
+
+from __future__ import annotations
+from typing import List, Optional, Sequence
+
+
+class SplitTimer:
+    """
+    Split времена на живия run за всеки checkpoint + delta спрямо reference
+    (best ghost-а или запазените в профила splits).
+
+    Пази running max на distance (след respawn distance пада, но checkpoint-ът
+    вече е минат), така че live индексът distance -> time е монотонен и се
+    обновява инкрементално: O(1) на кадър, без да пази самите samples.
+    """
+
+    def __init__(self, checkpoints: Sequence[float]):
+        self.checkpoints: List[float] = [float(c) for c in checkpoints]
+        self.reference: Optional[List[Optional[float]]] = None
+        self.start()
+
+    def start(self) -> None:
+        self.splits: List[Optional[float]] = [None] * len(self.checkpoints)
+        self._next = 0
+        self._max_d = 0.0
+        self._max_t = 0.0
+
+    def set_reference(self, splits: Optional[Sequence[Optional[float]]]) -> None:
+        if splits is not None and len(splits) != len(self.checkpoints):
+            splits = None  # друга конфигурация на трасето -> неизползваеми
+        self.reference = list(splits) if splits is not None else None
+
+    def update(self, t: float, distance: float) -> Optional[int]:
+        """
+        Подава текущото (t, distance). Връща индекса на последния checkpoint,
+        минат в този кадър (или None). Времето на минаване се интерполира.
+        """
+        if distance <= self._max_d:
+            return None
+
+        prev_d, prev_t = self._max_d, self._max_t
+        crossed = None
+        while self._next < len(self.checkpoints) and self.checkpoints[self._next] <= distance:
+            cp = self.checkpoints[self._next]
+            u = (cp - prev_d) / (distance - prev_d)
+            self.splits[self._next] = prev_t + (t - prev_t) * u
+            crossed = self._next
+            self._next += 1
+
+        self._max_d, self._max_t = float(distance), float(t)
+        return crossed
+
+    def delta(self, k: int) -> Optional[float]:
+        """split[k] - reference[k]; отрицателно = по-бърз от reference-а."""
+        if self.reference is None:
+            return None
+        live = self.splits[k]
+        ref = self.reference[k]
+        if live is None or ref is None:
+            return None
+        return live - ref
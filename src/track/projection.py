@@ -0,0 +1,183 @@
+from __future__ import annotations
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from track.track import lerp
+
+
+class ProjectionTable:
+    """
+    Статични perspective таблици за pseudo-3D пътя.
+
+    Всичко тук зависи само от размера на екрана, gamma и ширините на пътя,
+    затова се строи веднъж и се пресъздава само ако някой от тези параметри се смени.
+    Per-frame остават само curve offset-ите (Track.road_centers).
+    """
+    def __init__(
+        self,
+        *,
+        screen_w: int,
+        screen_h: int,
+        top_y: int,
+        bottom_y: int,
+        segments: int,
+        gamma: float,
+        road_width_far: float,
+        road_width_near: float,
+    ):
+        self.screen_w = int(screen_w)
+        self.screen_h = int(screen_h)
+        self.top_y = int(top_y)
+        self.bottom_y = int(bottom_y)
+        self.height = self.bottom_y - self.top_y
+        self.segments = int(segments)
+        self.gamma = float(gamma)
+        self.road_width_far = float(road_width_far)
+        self.road_width_near = float(road_width_near)
+
+        self.key = self.make_key(
+            screen_w=self.screen_w,
+            screen_h=self.screen_h,
+            top_y=self.top_y,
+            bottom_y=self.bottom_y,
+            segments=self.segments,
+            gamma=self.gamma,
+            road_width_far=self.road_width_far,
+            road_width_near=self.road_width_near,
+        )
+
+        # per point (segments + 1): p=0 е хоризонтът, p=1 е пред колата
+        n = self.segments
+        self.ps: List[float] = [(i / n) ** self.gamma for i in range(n + 1)]
+        self.ys: List[int] = [self.y_at(p) for p in self.ps]
+        self.widths: List[int] = [self.road_width_at(p) for p in self.ps]
+        self.half_widths: List[int] = [w // 2 for w in self.widths]
+        self.dash_phase: List[float] = [p * 60.0 for p in self.ps]
+
+        # per strip (segments): дебелините се взимат от близкия край на лентата
+        self.edge_thickness: List[int] = [max(1, int(3 * p)) for p in self.ps[1:]]
+        self.line_widths: List[int] = [max(1, int(8 * p)) for p in self.ps[1:]]
+
+    @staticmethod
+    def make_key(
+        *,
+        screen_w: int,
+        screen_h: int,
+        top_y: int,
+        bottom_y: int,
+        segments: int,
+        gamma: float,
+        road_width_far: float,
+        road_width_near: float,
+    ) -> Tuple:
+        return (
+            int(screen_w), int(screen_h), int(top_y), int(bottom_y), int(segments),
+            float(gamma), float(road_width_far), float(road_width_near),
+        )
+
+    # ---------- shared perspective math ----------
+
+    def depth_at(self, dist_ahead: float, view_depth: float) -> float:
+        """dist_ahead (0..view_depth) -> depth 0..1 (0=хоризонт, 1=близо)."""
+        t = dist_ahead / view_depth
+        z_screen = 1.0 - t
+        return z_screen ** self.gamma
+
+    def depths_at(self, dist_ahead, view_depth: float) -> np.ndarray:
+        """Vectorized depth_at() (същите стойности за всеки елемент)."""
+        t = np.asarray(dist_ahead, dtype=np.float64) / view_depth
+        return (1.0 - t) ** self.gamma
+
+    def y_at(self, depth: float) -> int:
+        return int(self.top_y + depth * self.height)
+
+    def road_width_at(self, depth: float) -> int:
+        return int(lerp(self.road_width_far, self.road_width_near, depth) * self.screen_w)
+
+
+class FrameView:
+    """
+    Per-frame projection context: track + ProjectionTable + player distance.
+
+    Строи се веднъж на tick и се подава на всички render системи вместо
+    track_center_fn lambda-та. center x / y / road width се memoize-ват
+    по квантизиран depth, така че еднакви depth-ове не се смятат повторно.
+    """
+    def __init__(
+        self,
+        track,
+        projection: ProjectionTable,
+        distance: float,
+        *,
+        depth_steps: int = 4096,
+    ):
+        self.track = track
+        self.projection = projection
+        self.distance = float(distance)
+        self.depth_steps = int(depth_steps)
+
+        self.screen_w = projection.screen_w
+        self.screen_h = projection.screen_h
+        self.top_y = projection.top_y
+        self.bottom_y = projection.bottom_y
+
+        self._points: Dict[int, Tuple[int, int, int]] = {}
+        self._strip_centers: Optional[List[int]] = None
+
+    def is_current(self, track, projection: ProjectionTable, distance: float) -> bool:
+        return (
+            self.track is track
+            and self.projection is projection
+            and self.distance == float(distance)
+        )
+
+    @property
+    def strip_centers(self) -> List[int]:
+        """Road center x за всяка точка от projection.ps (едно batch извикване)."""
+        if self._strip_centers is None:
+            self._strip_centers = self.track.road_centers(
+                self.screen_w, self.distance, self.projection.ps
+            ).tolist()
+        return self._strip_centers
+
+    def depth_at(self, dist_ahead: float, view_depth: float) -> float:
+        return self.projection.depth_at(dist_ahead, view_depth)
+
+    def point(self, depth: float) -> Tuple[int, int, int]:
+        """depth -> (y, road_w, center_x), memoized по квантизиран depth."""
+        k = int(depth * self.depth_steps + 0.5)
+        pt = self._points.get(k)
+        if pt is None:
+            qd = k / self.depth_steps
+            proj = self.projection
+            pt = (
+                proj.y_at(qd),
+                proj.road_width_at(qd),
+                self.track.road_center_x(self.screen_w, self.distance, qd),
+            )
+            self._points[k] = pt
+        return pt
+
+    def points(self, depths) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Vectorized point(): depth масив -> (y, road_w, center_x) int масиви,
+        със същото квантизиране на depth и същите стойности като point().
+        """
+        k = np.floor(np.asarray(depths, dtype=np.float64) * self.depth_steps + 0.5)
+        qd = k / self.depth_steps
+        proj = self.projection
+        y = np.trunc(proj.top_y + qd * proj.height).astype(np.int64)
+        far, near = proj.road_width_far, proj.road_width_near
+        road_w = np.trunc((far + (near - far) * qd) * self.screen_w).astype(np.int64)
+        cx = self.track.road_centers(self.screen_w, self.distance, qd)
+        return y, road_w, cx
+
+    def center_x(self, depth: float) -> int:
+        return self.point(depth)[2]
+
+    def y_at(self, depth: float) -> int:
+        return self.point(depth)[0]
+
+    def road_width_at(self, depth: float) -> int:
+        return self.point(depth)[1]
@@ -1,8 +1,11 @@
 # src/1/1.py
 
 from __future__ import annotations
+from bisect import bisect_left
 from dataclasses import dataclass
-from typing import List, Dict
+from typing import List, Dict, Optional
+
+import numpy as np
 
 
 def lerp(a: float, b: float, t: float) -> float:
@@ -38,7 +41,8 @@ class Track:
         *,
         blend_zone: float = 0.22,      # % от сегмента за плавен преход към следващия
         lookahead: float = 350.0,      # units “напред” за визуализация на завоя
-        curve_scale_px: float = 280.0  # пиксели offset при силен завой
+        curve_scale_px: float = 280.0, # пиксели offset при силен завой
+        curve_lut_step: Optional[float] = None,  # units между LUT sample-и (None = точно смятане)
     ):
         self.level_id = level_id
         self.length = float(length)
@@ -51,6 +55,31 @@ class Track:
         self.lookahead = float(lookahead)
         self.curve_scale_px = float(curve_scale_px)
 
+        # prefix-sum индекс: seg_starts[i] / seg_ends[i] за bisect lookup
+        # (натрупваме в същия ред като стария линеен обход -> същите float-ове)
+        self.seg_starts: List[float] = []
+        self.seg_ends: List[float] = []
+        acc = 0.0
+        for seg in self.segments:
+            self.seg_starts.append(acc)
+            acc = acc + seg.length
+            self.seg_ends.append(acc)
+
+        # същият индекс като numpy масиви за batch API-то
+        curves = [seg.curve for seg in self.segments]
+        self._np_starts = np.array(self.seg_starts, dtype=np.float64)
+        self._np_ends = np.array(self.seg_ends, dtype=np.float64)
+        self._np_lengths = np.array([seg.length for seg in self.segments], dtype=np.float64)
+        self._np_c0 = np.array(curves, dtype=np.float64)
+        self._np_c1 = np.array(curves[1:] + curves[-1:], dtype=np.float64)
+
+        # optional curve LUT (приблизителен, за много дълги трасета)
+        self.curve_lut_step: Optional[float] = None
+        self._curve_lut: List[float] = []
+        self._np_lut: Optional[np.ndarray] = None
+        if curve_lut_step:
+            self.build_curve_lut(curve_lut_step)
+
         # checkpoints
         cps = []
         d = self.checkpoint_every
@@ -61,32 +90,71 @@ class Track:
             cps.append(self.length)
         self.checkpoints = cps
 
+    def build_curve_lut(self, step: float) -> None:
+        """
+        Precompute curve samples every `step` units; curve_at() then interpolates
+        between them instead of doing the exact blend.
+        """
+        step = float(step)
+        if step <= 0.0:
+            raise ValueError("curve_lut_step must be > 0")
+
+        n = int(self.length / step) + 2
+        self._curve_lut = [self._curve_exact(min(i * step, self.length)) for i in range(n)]
+        self._np_lut = np.array(self._curve_lut, dtype=np.float64)
+        self.curve_lut_step = step
+
+    def clear_curve_lut(self) -> None:
+        self.curve_lut_step = None
+        self._curve_lut = []
+        self._np_lut = None
+
+    def segment_index_at(self, dist: float) -> int:
+        """
+        Index of the segment containing dist (first segment whose end >= dist).
+        Returns len(self.segments) if dist is past the last segment.
+        """
+        return bisect_left(self.seg_ends, dist)
+
     def curve_at(self, dist: float) -> float:
+        if self.curve_lut_step is not None:
+            return self._curve_from_lut(dist)
+        return self._curve_exact(dist)
+
+    def _curve_from_lut(self, dist: float) -> float:
         dist = max(0.0, min(dist, self.length))
 
-        acc = 0.0
-        for idx, seg in enumerate(self.segments):
-            start = acc
-            end = acc + seg.length
-            if dist <= end:
-                c0 = seg.curve
-                c1 = c0
-                if idx + 1 < len(self.segments):
-                    c1 = self.segments[idx + 1].curve
+        f = dist / self.curve_lut_step
+        i = int(f)
+        lut = self._curve_lut
+        if i + 1 >= len(lut):
+            return lut[-1]
+        return lerp(lut[i], lut[i + 1], f - i)
 
-                t = (dist - start) / max(1.0, seg.length)  # 0..1 в сегмента
-                bs = 1.0 - self.blend_zone
+    def _curve_exact(self, dist: float) -> float:
+        dist = max(0.0, min(dist, self.length))
+
+        idx = self.segment_index_at(dist)
+        if idx >= len(self.segments):
+            return 0.0
 
-                if t < bs or c0 == c1:
-                    return c0
+        seg = self.segments[idx]
+        start = self.seg_starts[idx]
 
-                u = (t - bs) / max(1e-6, self.blend_zone)  # 0..1 в blend зоната
-                u = smoothstep(u)
-                return lerp(c0, c1, u)
+        c0 = seg.curve
+        c1 = c0
+        if idx + 1 < len(self.segments):
+            c1 = self.segments[idx + 1].curve
 
-            acc = end
+        t = (dist - start) / max(1.0, seg.length)  # 0..1 в сегмента
+        bs = 1.0 - self.blend_zone
 
-        return 0.0
+        if t < bs or c0 == c1:
+            return c0
+
+        u = (t - bs) / max(1e-6, self.blend_zone)  # 0..1 в blend зоната
+        u = smoothstep(u)
+        return lerp(c0, c1, u)
 
     def road_center_x(self, screen_w: int, distance: float, p: float) -> int:
         """
@@ -102,3 +170,59 @@ class Track:
 
         offset = int(c * (p ** 1.2) * self.curve_scale_px)
         return (screen_w // 2) + offset
+
+    # ---------- batch API ----------
+
+    def curves_at(self, dists) -> np.ndarray:
+        """
+        Vectorized curve_at() за цял масив от разстояния.
+        Дава същите стойности като curve_at() за всеки елемент.
+        """
+        dist = np.clip(np.asarray(dists, dtype=np.float64), 0.0, self.length)
+
+        if self.curve_lut_step is not None:
+            f = dist / self.curve_lut_step
+            i = f.astype(np.int64)
+            last = len(self._np_lut) - 1
+            inside = i < last
+            i0 = np.minimum(i, last)
+            i1 = np.minimum(i + 1, last)
+            a = self._np_lut[i0]
+            b = self._np_lut[i1]
+            return np.where(inside, a + (b - a) * (f - i), self._np_lut[last])
+
+        n = len(self.segments)
+        if n == 0:
+            return np.zeros_like(dist)
+
+        idx = np.searchsorted(self._np_ends, dist, side="left")
+        past_end = idx >= n
+        idx = np.minimum(idx, n - 1)
+
+        c0 = self._np_c0[idx]
+        c1 = self._np_c1[idx]
+
+        t = (dist - self._np_starts[idx]) / np.maximum(1.0, self._np_lengths[idx])
+        bs = 1.0 - self.blend_zone
+
+        u = (t - bs) / max(1e-6, self.blend_zone)
+        u = np.clip(u, 0.0, 1.0)
+        u = u * u * (3.0 - 2.0 * u)
+        blended = c0 + (c1 - c0) * u
+
+        out = np.where((t < bs) | (c0 == c1), c0, blended)
+        out[past_end] = 0.0
+        return out
+
+    def road_centers(self, screen_w: int, distance: float, depths) -> np.ndarray:
+        """
+        Vectorized road_center_x() за масив от p (depth) стойности.
+        Връща int масив, същите стойности като road_center_x() за всеки елемент.
+        """
+        p = np.clip(np.asarray(depths, dtype=np.float64), 0.0, 1.0)
+
+        dist_ahead = distance + (1.0 - p) * self.lookahead
+        c = self.curves_at(dist_ahead)
+
+        offset = np.trunc(c * (p ** 1.2) * self.curve_scale_px).astype(np.int64)
+        return (screen_w // 2) + offset
@@ -0,0 +1,195 @@
+"""
+Offline bake на resize-натите варианти на assets за конкретни резолюции.
+
+    cd src
+    python -m utils.asset_baker --res 1920x1080 --res 1280x720 [--force] [--workers N]
+
+Записва PNG-та в cache/baked/<WxH>/ (scale-only -> common/) + manifest.json (sha1/size/mtime на source-а).
+При нормален start AssetManager-ът зарежда bake-натия вариант директно, ако
+source-ът не е променян; иначе resample-ва runtime както преди.
+Повторно пускане bake-ва само променените/липсващите варианти.
+"""
+from __future__ import annotations
+import argparse
+import hashlib
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+from settings1 import CAR_ASSETS
+from utils.asset_manager import AssetManager
+from utils.baked_assets import (
+    BAKED_DIR,
+    PROJECT_ROOT,
+    bake_key,
+    file_sha1,
+    load_manifest,
+    save_manifest,
+    source_stat,
+)
+
+RESIZE_OPTS = ("size", "scale", "fit", "crop", "smooth")
+
+
+def level_ids() -> List[int]:
+    levels_dir = os.path.join(PROJECT_ROOT, "assets", "Levels")
+    ids = []
+    for name in os.listdir(levels_dir):
+        m = re.fullmatch(r"level_(\d+)", name)
+        if m and os.path.isdir(os.path.join(levels_dir, name)):
+            ids.append(int(m.group(1)))
+    return sorted(ids)
+
+
+def ui_asset_specs(screen_size) -> list:
+    """Resize-натите images от менютата (menu, car select, level select, level scene)."""
+    w, h = screen_size
+    assets_path = os.path.join(PROJECT_ROOT, "assets")
+    levels_path = os.path.join(assets_path, "Levels")
+
+    specs = [dict(path=os.path.join(assets_path, "Basic", "menu_bg.png"), size=(w, h), smooth=False)]
+
+    for car in CAR_ASSETS.values():
+        front = os.path.join(assets_path, "Car images", car["folder"], car["front"])
+        specs.append(dict(path=front, size=(int(w * 0.35), int(h * 0.28))))
+
+    for level in level_ids():
+        specs.append(dict(path=os.path.join(levels_path, f"level{level}_bg.png"), size=(int(w * 0.26), int(h * 0.30))))
+        specs.append(dict(path=os.path.join(levels_path, f"level{level}_bg.jpg"), size=(w, h), smooth=False))
+    return specs
+
+
+def collect_specs(screen_size) -> List[dict]:
+    """Уникалните resize варианти (по bake_key) за тази резолюция."""
+    from scenes.game import game_asset_specs
+
+    specs = ui_asset_specs(screen_size)
+    for level in level_ids():
+        for car_id in CAR_ASSETS:
+            specs.extend(game_asset_specs(screen_size, level, car_id))
+
+    out: Dict[str, dict] = {}
+    for spec in specs:
+        if spec.get("kind", "image") != "image" or not os.path.exists(spec["path"]):
+            continue
+        opts = {k: spec[k] for k in RESIZE_OPTS if k in spec}
+        if not any(opts.get(k) is not None for k in ("size", "scale", "fit")):
+            continue  # un-scaled decode-ът няма какво да спести
+        out.setdefault(bake_key(spec["path"], **opts), dict(path=spec["path"], opts=opts))
+    return list(out.values())
+
+
+def _bake_one(path: str, opts: dict, out_path: str) -> Tuple[int, int]:
+    """Worker process: decode + crop + resample, после запис като PNG."""
+    if not pygame.get_init():
+        pygame.init()
+    img = AssetManager._decode_image(path, **opts)
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    tmp = out_path + ".tmp.png"
+    pygame.image.save(img, tmp)
+    os.replace(tmp, out_path)
+    return img.get_size()
+
+
+def bake(resolutions, *, force: bool = False, workers: Optional[int] = None, root: str = BAKED_DIR) -> dict:
+    manifest = load_manifest(root)
+    entries = manifest["entries"]
+    hashes: Dict[str, str] = {}
+
+    todo = []
+    seen = set()
+    stats = {"baked": 0, "up_to_date": 0, "failed": 0}
+
+    for res in resolutions:
+        for item in collect_specs(res):
+            path, opts = item["path"], item["opts"]
+            key = bake_key(path, **opts)
+            if key in seen:
+                continue
+            seen.add(key)
+            if path not in hashes:
+                hashes[path] = file_sha1(path)
+            sha1 = hashes[path]
+
+            entry = entries.get(key)
+            if (
+                not force
+                and entry
+                and entry.get("source_sha1") == sha1
+                and os.path.exists(os.path.join(root, entry["file"]))
+            ):
+                # същото съдържание -> само обновяваме stat-а (напр. след git checkout)
+                entry["source_size"], entry["source_mtime_ns"] = source_stat(path)
+                stats["up_to_date"] += 1
+                continue
+
+            name = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16] + ".png"
+            # scale-only варианти не зависят от резолюцията
+            res_dir = "common" if opts.get("size") is None and opts.get("fit") is None else f"{res[0]}x{res[1]}"
+            rel = f"{res_dir}/{name}"
+            todo.append((key, path, opts, rel, sha1))
+
+    if todo:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                (key, path, rel, sha1, pool.submit(_bake_one, path, opts, os.path.join(root, rel)))
+                for key, path, opts, rel, sha1 in todo
+            ]
+            for key, path, rel, sha1, fut in futures:
+                try:
+                    w, h = fut.result()
+                except Exception as e:
+                    print(f"[asset_baker] FAILED {key}: {e}", file=sys.stderr)
+                    entries.pop(key, None)
+                    stats["failed"] += 1
+                    continue
+                size, mtime_ns = source_stat(path)
+                entries[key] = {
+                    "source": os.path.relpath(path, PROJECT_ROOT).replace(os.sep, "/"),
+                    "source_sha1": sha1,
+                    "source_size": size,
+                    "source_mtime_ns": mtime_ns,
+                    "file": rel,
+                    "size": [w, h],
+                }
+                stats["baked"] += 1
+
+    save_manifest(manifest, root)
+    return stats
+
+
+def parse_res(text: str) -> Tuple[int, int]:
+    try:
+        w, h = text.lower().split("x")
+        return int(w), int(h)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WxH, got {text!r}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Bake resized asset variants for given screen resolutions.")
+    parser.add_argument("--res", type=parse_res, action="append", required=True, help="screen resolution, e.g. 1920x1080")
+    parser.add_argument("--force", action="store_true", help="re-bake everything")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default=BAKED_DIR)
+    args = parser.parse_args(argv)
+
+    # decode-ът в _decode_image ползва convert() -> нужен е display (dummy е достатъчен)
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+
+    stats = bake(args.res, force=args.force, workers=args.workers, root=args.out)
+    print(f"[asset_baker] baked={stats['baked']} up_to_date={stats['up_to_date']} failed={stats['failed']}")
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
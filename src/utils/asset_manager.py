@@ -0,0 +1,466 @@
+from __future__ import annotations
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+import pygame
+
+from utils.asset_pack import ASSETS_DIR, PackReader, open_pack
+from utils.baked_assets import BakedIndex
+from utils.sprite_cache import SPRITE_CACHE
+
+
+def _load_source(src) -> pygame.Surface:
+    """src е път или PackReader (тогава името е namehint за формата)."""
+    if isinstance(src, PackReader):
+        return pygame.image.load(src, src.name)
+    return pygame.image.load(src)
+
+
+def target_size(
+    src_size: Tuple[int, int],
+    *,
+    size: Optional[Tuple[int, int]] = None,
+    scale: Optional[float] = None,
+    fit: Optional[Tuple[int, int]] = None,
+) -> Optional[Tuple[int, int]]:
+    """Resolves size/scale/fit (fit = max (w, h), пази пропорциите) до краен размер."""
+    if size is not None:
+        return int(size[0]), int(size[1])
+    w, h = src_size
+    if scale is not None:
+        return int(w * scale), int(h * scale)
+    if fit is not None:
+        s = min(fit[0] / w, fit[1] / h)
+        return int(w * s), int(h * s)
+    return None
+
+
+class LoadJob:
+    """
+    Група images, които се decode-ват + scale-ват на thread pool-а (+ mip
+    нивата на sprite-овете), и произволни именувани tasks (напр. ghost данни).
+
+    Worker-ите връщат 32-bit surfaces, които още не са convert-нати към
+    display формата; finish() трябва да се извика на main thread-а, за да
+    ги convert-не и да ги сложи в кеша на AssetManager-а. Резултатите на
+    tasks са в results (липсват, ако task-ът е хвърлил).
+    """
+    def __init__(
+        self,
+        manager: "AssetManager",
+        specs: List[dict],
+        futures: List[Future],
+        tasks: Optional[Dict[str, Future]] = None,
+    ):
+        self.manager = manager
+        self.specs = specs
+        self.futures = futures
+        self.tasks = tasks or {}
+        self.results: Dict[str, Any] = {}
+        self.finished = False
+
+    def _all(self) -> List[Future]:
+        return [*self.futures, *self.tasks.values()]
+
+    def done(self) -> bool:
+        return all(f.done() for f in self._all())
+
+    def progress(self) -> float:
+        futures = self._all()
+        if not futures:
+            return 1.0
+        return sum(1 for f in futures if f.done()) / len(futures)
+
+    def finish(self) -> None:
+        """Main thread only. Грешките се пропускат: липсващото ще се зареди синхронно после."""
+        if self.finished:
+            return
+        self.finished = True
+
+        for spec, fut in zip(self.specs, self.futures):
+            try:
+                result = fut.result()
+            except Exception:
+                continue
+            self.manager._store_preloaded(spec, result)
+
+        for name, fut in self.tasks.items():
+            try:
+                self.results[name] = fut.result()
+            except Exception as e:
+                print(f"[assets] preload task {name} failed: {e}")
+
+
+class AssetManager:
+    """
+    Process-wide кеш за изображения и звуци.
+
+    Всеки asset се decode-ва веднъж на процес, ключ = (път, target size/scale,
+    convert/crop/smooth флагове). Кешът оцелява при смяна на сцени и при restart
+    на level. Assets, заредени с group (напр. "level_2"), могат да се освободят
+    с unload_group().
+
+    Върнатите Surface-и са споделени -> caller-ите не трябва да ги променят
+    (copy() преди set_alpha и т.н.).
+
+    Ако има bake-нат вариант (utils.asset_baker) за същия resize, той се зарежда
+    директно, без resample. Ако има assets.pack (utils.asset_pack), файловете
+    под assets/ се четат от mmap-натия archive вместо от диска.
+    """
+    def __init__(self):
+        self._images: Dict[Tuple, pygame.Surface] = {}
+        self._sounds: Dict[str, pygame.mixer.Sound] = {}
+        self._groups: Dict[str, Set[Tuple[str, Hashable]]] = {}
+
+        self.hits = 0
+        self.misses = 0
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: List[LoadJob] = []  # незавършени jobs; pump() ги прибира
+        self.baked = BakedIndex()
+        self.pack = open_pack()
+
+    @staticmethod
+    def asset_name(path: str) -> str:
+        """Normalized path, който се ползва като ключ (и като име в SPRITE_CACHE)."""
+        return os.path.normcase(os.path.abspath(path))
+
+    # ---------- sources (assets.pack или диск) ----------
+
+    def pack_name(self, path: str) -> Optional[str]:
+        """Името на path в pack-а ("Levels/level_1/horizon.png") или None, ако е извън assets/."""
+        if self.pack is None:
+            return None
+        rel = os.path.relpath(os.path.abspath(path), ASSETS_DIR)
+        if rel == os.pardir or rel.startswith(os.pardir + os.sep):
+            return None
+        return rel.replace(os.sep, "/")
+
+    def _source(self, path: str):
+        name = self.pack_name(path)
+        if name is not None and name in self.pack:
+            return self.pack.open(name)
+        return path
+
+    def _baked(self, path: str, **opts) -> Optional[str]:
+        name = self.pack_name(path)
+        packed = self.pack.view(name) if name is not None and name in self.pack else None
+        return self.baked.lookup(path, packed=packed, **opts)
+
+    def exists(self, path: str) -> bool:
+        name = self.pack_name(path)
+        if name is not None and name in self.pack:
+            return True
+        return os.path.exists(path)
+
+    def isdir(self, path: str) -> bool:
+        name = self.pack_name(path)
+        if name is not None and self.pack.isdir(name):
+            return True
+        return os.path.isdir(path)
+
+    def listdir(self, path: str) -> List[str]:
+        name = self.pack_name(path)
+        if name is not None and self.pack.isdir(name):
+            return self.pack.listdir(name)
+        return os.listdir(path)
+
+    def _track(self, group: Optional[str], kind: str, key: Hashable) -> None:
+        if group:
+            self._groups.setdefault(group, set()).add((kind, key))
+
+    # ---------- images ----------
+
+    def image(
+        self,
+        path: str,
+        *,
+        size: Optional[Tuple[int, int]] = None,
+        scale: Optional[float] = None,
+        fit: Optional[Tuple[int, int]] = None,
+        alpha: Optional[bool] = True,
+        crop: bool = False,
+        smooth: bool = True,
+        group: Optional[str] = None,
+    ) -> pygame.Surface:
+        """
+        path  : image file
+        size  : target (w, h); scale: множител спрямо (crop-натия) оригинал;
+                fit: max (w, h) със запазени пропорции
+        alpha : True -> convert_alpha(), False -> convert(), None -> без convert
+        crop  : изрязва прозрачните краища (get_bounding_rect)
+        smooth: smoothscale вместо scale
+        """
+        key = self._image_key(path, size=size, scale=scale, fit=fit, alpha=alpha, crop=crop, smooth=smooth)
+
+        img = self._images.get(key)
+        if img is not None:
+            self.hits += 1
+            self._track(group, "image", key)
+            return img
+
+        self.misses += 1
+
+        resized = size is not None or scale is not None or fit is not None
+        baked = None
+        if resized:
+            baked = self._baked(path, size=size, scale=scale, fit=fit, crop=crop, smooth=smooth)
+
+        if baked:
+            # crop-натите винаги са convert_alpha (като в _load_image)
+            img = self._load_image(baked, alpha=True if crop else alpha, crop=False)
+        elif not resized:
+            img = self._load_image(self._source(path), alpha=alpha, crop=crop)
+        else:
+            # reuse-ваме un-scaled decode-а (споделен между различни target размери)
+            src = self.image(path, alpha=alpha, crop=crop, group=group)
+            dst = target_size(src.get_size(), size=size, scale=scale, fit=fit)
+            if smooth:
+                img = pygame.transform.smoothscale(src, dst)
+            else:
+                img = pygame.transform.scale(src, dst)
+
+        self._images[key] = img
+        self._track(group, "image", key)
+        return img
+
+    def _image_key(
+        self,
+        path: str,
+        *,
+        size: Optional[Tuple[int, int]] = None,
+        scale: Optional[float] = None,
+        fit: Optional[Tuple[int, int]] = None,
+        alpha: Optional[bool] = True,
+        crop: bool = False,
+        smooth: bool = True,
+    ) -> Tuple:
+        if size is not None:
+            size = (int(size[0]), int(size[1]))
+        if fit is not None:
+            fit = (int(fit[0]), int(fit[1]))
+        return (self.asset_name(path), size, scale, fit, alpha, crop, smooth)
+
+    @staticmethod
+    def _load_image(src, *, alpha: Optional[bool], crop: bool) -> pygame.Surface:
+        img = _load_source(src)
+        if crop or alpha:
+            img = img.convert_alpha()
+        elif alpha is False:
+            img = img.convert()
+
+        if crop:
+            rect = img.get_bounding_rect()
+            if rect.width > 0 and rect.height > 0:
+                img = img.subsurface(rect).copy()
+        return img
+
+    # ---------- background loading ----------
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            workers = max(2, min(4, os.cpu_count() or 2))
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="assets")
+        return self._executor
+
+    def preload(self, specs: List[dict], tasks: Optional[Dict[str, Callable[[], Any]]] = None) -> LoadJob:
+        """
+        Стартира decode + scale на specs във фонов thread pool.
+        spec = dict(kind="image"|"sound", path=..., + същите keyword-и като image()/sound()).
+        Image spec може да има sprites=[(name, alpha), ...]: mip нивата се строят
+        във worker-а, а finish() ги регистрира в SPRITE_CACHE под тези имена.
+        Вече кешираните assets се пропускат.
+        tasks: name -> callable без аргументи, пуска се на същия pool.
+        """
+        todo: List[dict] = []
+        futures: List[Future] = []
+
+        for spec in specs:
+            spec = dict(spec)
+            kind = spec.pop("kind", "image")
+            path = spec["path"]
+            if not self.exists(path):
+                continue
+
+            if kind == "sound":
+                if self.asset_name(path) in self._sounds:
+                    continue
+                fut = self._pool().submit(pygame.mixer.Sound, self._source(path))
+            else:
+                opts = {k: spec[k] for k in ("size", "scale", "fit", "alpha", "crop", "smooth") if k in spec}
+                if self._image_key(path, **opts) in self._images:
+                    continue
+
+                resize = dict(
+                    size=opts.get("size"),
+                    scale=opts.get("scale"),
+                    fit=opts.get("fit"),
+                    crop=opts.get("crop", False),
+                    smooth=opts.get("smooth", True),
+                )
+                baked = None
+                if resize["size"] or resize["scale"] or resize["fit"]:
+                    baked = self._baked(path, **resize)
+
+                if baked:
+                    src, resize = baked, {}
+                else:
+                    src = self._source(path)
+                if spec.get("sprites"):
+                    fut = self._pool().submit(self._decode_sprite, src, **resize)
+                else:
+                    fut = self._pool().submit(self._decode_image, src, **resize)
+
+            spec["kind"] = kind
+            todo.append(spec)
+            futures.append(fut)
+
+        task_futures = {name: self._pool().submit(fn) for name, fn in (tasks or {}).items()}
+        job = LoadJob(self, todo, futures, task_futures)
+        self._pending.append(job)
+        return job
+
+    def pump(self) -> int:
+        """
+        Main thread, веднъж на кадър: finish()-ва готовите jobs, дори ако вече
+        никой не ги чака (ESC от LoadingScene, hover preload в level select),
+        за да не се губи декодираното. Връща колко jobs е прибрал.
+        """
+        if not self._pending:
+            return 0
+        done = [job for job in self._pending if job.finished or job.done()]
+        for job in done:
+            job.finish()
+        self._pending = [job for job in self._pending if not job.finished]
+        return len(done)
+
+    @classmethod
+    def _decode_sprite(cls, src, **resize) -> Tuple[pygame.Surface, List[pygame.Surface]]:
+        """Worker: като _decode_image + mip нивата 1.. (още без display convert)."""
+        img = cls._decode_image(src, **resize)
+        return img, SPRITE_CACHE.build_mips(img)[1:]
+
+    @staticmethod
+    def _decode_image(
+        src,
+        *,
+        size: Optional[Tuple[int, int]] = None,
+        scale: Optional[float] = None,
+        fit: Optional[Tuple[int, int]] = None,
+        crop: bool = False,
+        smooth: bool = True,
+    ) -> pygame.Surface:
+        """
+        Worker thread/process: decode -> 32-bit RGBA -> crop -> scale (без display convert).
+        src е път или PackReader. Ползва се и от asset_baker-а.
+        """
+        img = _load_source(src)
+        if img.get_colorkey() is not None:
+            # palette PNG с tRNS: blit-ът пропуска colorkey пикселите (като convert_alpha)
+            rgba = pygame.Surface(img.get_size(), pygame.SRCALPHA, 32)
+            rgba.fill((0, 0, 0, 0))
+            rgba.blit(img, (0, 0))
+            img = rgba
+        else:
+            img = img.convert(pygame.Surface((1, 1), pygame.SRCALPHA, 32))
+
+        if crop:
+            rect = img.get_bounding_rect()
+            if rect.width > 0 and rect.height > 0:
+                img = img.subsurface(rect).copy()
+
+        size = target_size(img.get_size(), size=size, scale=scale, fit=fit)
+        if size is not None:
+            if smooth:
+                img = pygame.transform.smoothscale(img, size)
+            else:
+                img = pygame.transform.scale(img, size)
+        return img
+
+    def _store_preloaded(self, spec: dict, result) -> None:
+        group = spec.get("group")
+        path = spec["path"]
+
+        if spec["kind"] == "sound":
+            key = self.asset_name(path)
+            self._sounds.setdefault(key, result)
+            self._track(group, "sound", key)
+            return
+
+        mips = None
+        if spec.get("sprites"):
+            result, mips = result
+
+        alpha = spec.get("alpha", True)
+        key = self._image_key(
+            path,
+            size=spec.get("size"),
+            scale=spec.get("scale"),
+            fit=spec.get("fit"),
+            alpha=alpha,
+            crop=spec.get("crop", False),
+            smooth=spec.get("smooth", True),
+        )
+        if key not in self._images:
+            if alpha or spec.get("crop", False):
+                result = result.convert_alpha()
+            elif alpha is False:
+                result = result.convert()
+            self._images[key] = result
+        self._track(group, "image", key)
+
+        base = self._images[key]
+        for name, sprite_alpha in spec.get("sprites") or ():
+            if not SPRITE_CACHE.has(name):
+                SPRITE_CACHE.register(name, base, alpha=sprite_alpha, mips=[m.convert_alpha() for m in mips])
+
+    # ---------- sounds ----------
+
+    def sound(self, path: str, *, group: Optional[str] = None) -> pygame.mixer.Sound:
+        key = self.asset_name(path)
+        snd = self._sounds.get(key)
+        if snd is None:
+            self.misses += 1
+            snd = pygame.mixer.Sound(self._source(path))
+            self._sounds[key] = snd
+        else:
+            self.hits += 1
+        self._track(group, "sound", key)
+        return snd
+
+    # ---------- unload ----------
+
+    def unload_group(self, group: str) -> Set[str]:
+        """
+        Освобождава всички assets, заредени с този group.
+        Връща asset_name-ите на освободените файлове.
+        """
+        freed: Set[str] = set()
+        for kind, key in self._groups.pop(group, set()):
+            if kind == "image":
+                self._images.pop(key, None)
+                freed.add(key[0])
+            else:
+                self._sounds.pop(key, None)
+                freed.add(key)
+        return freed
+
+    def clear(self) -> None:
+        self._images.clear()
+        self._sounds.clear()
+        self._groups.clear()
+
+    def stats(self) -> dict:
+        return {
+            "images": len(self._images),
+            "sounds": len(self._sounds),
+            "groups": sorted(self._groups),
+            "hits": self.hits,
+            "misses": self.misses,
+            "packed": len(self.pack) if self.pack is not None else 0,
+        }
+
+
+# shared instance за целия процес
+ASSETS = AssetManager()
@@ -0,0 +1,248 @@
+"""
+Packed asset archive: целият assets/ в един файл, отворен с mmap.
+
+Layout (little-endian):
+
+    header : magic b"LDPK" | version u16 | reserved u16 | count u32 | data_offset u32
+    index  : count x (offset u64 | length u32 | name_len u16 | format 4s) + name (utf-8)
+    data   : blobs, подравнени на DATA_ALIGN байта
+
+name е пътят спрямо assets/ с "/" (напр. "Levels/level_1/horizon.png"),
+format е разширението ("png", "wav", ...), ползва се като namehint при decode.
+
+    cd src
+    python -m utils.asset_pack build [--src ../assets] [--out ../assets.pack]
+    python -m utils.asset_pack list
+"""
+from __future__ import annotations
+import argparse
+import io
+import mmap
+import os
+import struct
+import sys
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from utils.baked_assets import PROJECT_ROOT
+
+MAGIC = b"LDPK"
+VERSION = 1
+HEADER = struct.Struct("<4sHHII")
+ENTRY = struct.Struct("<QIH4s")
+DATA_ALIGN = 16
+
+ASSETS_DIR = os.path.join(PROJECT_ROOT, "assets")
+DEFAULT_PACK = os.path.join(PROJECT_ROOT, "assets.pack")
+PACK_FORMATS = ("png", "jpg", "jpeg", "bmp", "wav", "mp3", "ogg", "otf", "ttf")
+
+
+class PackError(Exception):
+    pass
+
+
+class PackReader(io.RawIOBase):
+    """Read-only file object над memoryview-то на един blob (без копие на целия asset)."""
+    def __init__(self, view: memoryview, name: str):
+        super().__init__()
+        self._view = view
+        self._pos = 0
+        self.name = name  # namehint за pygame.image.load
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        n = min(len(b), len(self._view) - self._pos)
+        if n <= 0:
+            return 0
+        b[:n] = self._view[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = len(self._view) + offset
+        else:
+            raise ValueError(f"invalid whence: {whence}")
+        if pos < 0:
+            raise ValueError("negative seek position")
+        self._pos = pos
+        return pos
+
+    def tell(self) -> int:
+        return self._pos
+
+
+class AssetPack:
+    """
+    mmap-нат archive. Индексът се парсва веднъж при отваряне; blob-овете се
+    четат чак при view()/open() - ОС-ът page-ва само реално ползваните байтове.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise PackError(f"empty pack: {path}")
+        self._buf = memoryview(self._mm)
+        self.index: Dict[str, Tuple[int, int, str]] = {}
+        self._dirs: Dict[str, List[str]] = {}
+        try:
+            self._read_index()
+        except Exception:
+            self.close()
+            raise
+
+    def _read_index(self) -> None:
+        if len(self._mm) < HEADER.size:
+            raise PackError(f"truncated pack: {self.path}")
+        magic, version, _, count, data_offset = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise PackError(f"not an asset pack: {self.path}")
+        if version != VERSION:
+            raise PackError(f"unsupported pack version {version}: {self.path}")
+
+        pos = HEADER.size
+        for _ in range(count):
+            offset, length, name_len, fmt = ENTRY.unpack_from(self._mm, pos)
+            pos += ENTRY.size
+            name = bytes(self._mm[pos:pos + name_len]).decode("utf-8")
+            pos += name_len
+            if offset < data_offset or offset + length > len(self._mm):
+                raise PackError(f"corrupt entry {name!r} in {self.path}")
+            self.index[name] = (offset, length, fmt.rstrip(b"\0").decode("ascii"))
+
+            parent, _, base = name.rpartition("/")
+            self._dirs.setdefault(parent, []).append(base)
+            # междинните директории също трябва да се виждат от isdir()
+            while parent:
+                parent, _, base = parent.rpartition("/")
+                kids = self._dirs.setdefault(parent, [])
+                if base not in kids:
+                    kids.append(base)
+
+    # ---------- lookup ----------
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def names(self) -> Iterator[str]:
+        return iter(self.index)
+
+    def isdir(self, name: str) -> bool:
+        return name.strip("/") in self._dirs
+
+    def listdir(self, name: str) -> List[str]:
+        return sorted(self._dirs.get(name.strip("/"), []))
+
+    def view(self, name: str) -> memoryview:
+        offset, length, _ = self.index[name]
+        return self._buf[offset:offset + length]
+
+    def open(self, name: str) -> PackReader:
+        offset, length, fmt = self.index[name]
+        return PackReader(self._buf[offset:offset + length], name)
+
+    def close(self) -> None:
+        self._buf.release()
+        self._mm.close()
+        self._file.close()
+
+
+def open_pack(path: str = DEFAULT_PACK) -> Optional[AssetPack]:
+    """Отваря pack-а, ако го има; иначе None (assets се четат от assets/ директно)."""
+    if not os.path.isfile(path):
+        return None
+    try:
+        return AssetPack(path)
+    except (OSError, PackError) as e:
+        print(f"[asset_pack] ignoring {path}: {e}", file=sys.stderr)
+        return None
+
+
+# ---------- builder ----------
+
+def _collect(src_dir: str) -> List[Tuple[str, str, str]]:
+    out = []
+    for dirpath, dirnames, filenames in os.walk(src_dir):
+        dirnames.sort()
+        for fn in sorted(filenames):
+            fmt = os.path.splitext(fn)[1].lower().lstrip(".")
+            if fmt not in PACK_FORMATS:
+                continue
+            full = os.path.join(dirpath, fn)
+            name = os.path.relpath(full, src_dir).replace(os.sep, "/")
+            out.append((name, full, fmt))
+    return out
+
+
+def build_pack(src_dir: str = ASSETS_DIR, out_path: str = DEFAULT_PACK) -> int:
+    """Пакетира src_dir в out_path (atomic replace). Връща броя на entries."""
+    files = _collect(src_dir)
+
+    names = [name.encode("utf-8") for name, _, _ in files]
+    index_size = sum(ENTRY.size + len(n) for n in names)
+    data_offset = HEADER.size + index_size
+    data_offset += -data_offset % DATA_ALIGN
+
+    sizes = [os.path.getsize(full) for _, full, _ in files]
+    offsets = []
+    pos = data_offset
+    for size in sizes:
+        offsets.append(pos)
+        pos += size + (-size % DATA_ALIGN)
+
+    tmp = out_path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(files), data_offset))
+        for (name, _, fmt), raw_name, offset, size in zip(files, names, offsets, sizes):
+            f.write(ENTRY.pack(offset, size, len(raw_name), fmt.encode("ascii")))
+            f.write(raw_name)
+
+        for (_, full, _), offset in zip(files, offsets):
+            f.write(b"\0" * (offset - f.tell()))
+            with open(full, "rb") as src:
+                f.write(src.read())
+    os.replace(tmp, out_path)
+    return len(files)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Build or inspect the packed asset archive.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_build = sub.add_parser("build", help="pack the assets/ directory")
+    p_build.add_argument("--src", default=ASSETS_DIR)
+    p_build.add_argument("--out", default=DEFAULT_PACK)
+
+    p_list = sub.add_parser("list", help="print the pack index")
+    p_list.add_argument("pack", nargs="?", default=DEFAULT_PACK)
+
+    args = parser.parse_args(argv)
+
+    if args.cmd == "build":
+        n = build_pack(args.src, args.out)
+        print(f"[asset_pack] {n} assets -> {args.out} ({os.path.getsize(args.out)} bytes)")
+        return 0
+
+    pack = AssetPack(args.pack)
+    for name, (offset, length, fmt) in pack.index.items():
+        print(f"{offset:>10} {length:>10} {fmt:<4} {name}")
+    pack.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+from typing import Dict, Optional, Tuple
+
+# src/utils -> src -> project root
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+BAKED_DIR = os.path.join(PROJECT_ROOT, "cache", "baked")
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+def rel_source(path: str) -> str:
+    """Source path relative to the project root, с "/" (ключът е еднакъв на всяка OS)."""
+    rel = os.path.relpath(os.path.abspath(path), PROJECT_ROOT)
+    return rel.replace(os.sep, "/")
+
+
+def bake_key(
+    path: str,
+    *,
+    size: Optional[Tuple[int, int]] = None,
+    scale: Optional[float] = None,
+    fit: Optional[Tuple[int, int]] = None,
+    crop: bool = False,
+    smooth: bool = True,
+) -> str:
+    """Manifest key за един resize вариант (alpha/convert се прилага при load, не е част от ключа)."""
+    parts = [rel_source(path)]
+    if size is not None:
+        parts.append(f"size={int(size[0])}x{int(size[1])}")
+    if scale is not None:
+        parts.append(f"scale={float(scale)!r}")
+    if fit is not None:
+        parts.append(f"fit={int(fit[0])}x{int(fit[1])}")
+    parts.append(f"crop={int(bool(crop))}")
+    parts.append(f"smooth={int(bool(smooth))}")
+    return "|".join(parts)
+
+
+def file_sha1(path: str) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def source_stat(path: str) -> Tuple[int, int]:
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+def load_manifest(root: str = BAKED_DIR) -> dict:
+    path = os.path.join(root, MANIFEST_NAME)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") == MANIFEST_VERSION and isinstance(data.get("entries"), dict):
+            return data
+    except (OSError, ValueError):
+        pass
+    return {"version": MANIFEST_VERSION, "entries": {}}
+
+
+def save_manifest(data: dict, root: str = BAKED_DIR) -> None:
+    os.makedirs(root, exist_ok=True)
+    path = os.path.join(root, MANIFEST_NAME)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+class BakedIndex:
+    """
+    Read-only изглед на manifest-а за runtime lookup.
+
+    Вариант се ползва само ако source-ът е същият като при bake-а: за asset от
+    assets.pack се сравнява sha1-ът на blob-а с source_sha1 от manifest-а (веднъж
+    на asset), иначе размерът и mtime-ът на файла. При разлика lookup() връща
+    None и AssetManager-ът resample-ва както преди.
+    """
+    def __init__(self, root: str = BAKED_DIR):
+        self.root = root
+        self._entries: Optional[Dict[str, dict]] = None
+        self._packed_sha1: Dict[str, str] = {}  # rel source -> sha1 на pack blob-а
+
+    def reload(self) -> None:
+        self._entries = None
+
+    def _load(self) -> Dict[str, dict]:
+        if self._entries is None:
+            self._entries = load_manifest(self.root)["entries"]
+        return self._entries
+
+    def _source_matches(self, path: str, entry: dict, packed: Optional[memoryview]) -> bool:
+        if packed is not None:
+            if len(packed) != entry.get("source_size"):
+                return False
+            rel = rel_source(path)
+            sha1 = self._packed_sha1.get(rel)
+            if sha1 is None:
+                sha1 = self._packed_sha1[rel] = hashlib.sha1(packed).hexdigest()
+            return sha1 == entry.get("source_sha1")
+
+        try:
+            return list(source_stat(path)) == [entry["source_size"], entry["source_mtime_ns"]]
+        except (OSError, KeyError):
+            return False
+
+    def lookup(self, path: str, *, packed: Optional[memoryview] = None, **opts) -> Optional[str]:
+        """packed: blob-ът на path в assets.pack (ако asset-ът се чете от pack-а)."""
+        entries = self._load()
+        if not entries:
+            return None
+
+        entry = entries.get(bake_key(path, **opts))
+        if not entry or not self._source_matches(path, entry, packed):
+            return None
+
+        out = os.path.join(self.root, entry["file"])
+        return out if os.path.exists(out) else None
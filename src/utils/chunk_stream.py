@@ -0,0 +1,145 @@
+from __future__ import annotations
+import math
+import random
+from bisect import bisect_right
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from utils.z_index import ZIndex
+
+# generate(rng, z) -> {<колона>: ...} за обектите на един chunk (z вече е поставено)
+ChunkGenerator = Callable[[random.Random, np.ndarray], Dict[str, np.ndarray]]
+
+
+def sorted_uniforms(rng: random.Random, a: float, b: float, m: int) -> np.ndarray:
+    """m сортирани uniform стойности в [a, b] за O(m) (нормализирани exponential spacings)."""
+    if m <= 0:
+        return np.empty(0, dtype=np.float64)
+    gen = np.random.default_rng(rng.getrandbits(64))
+    c = np.cumsum(gen.exponential(size=m + 1))
+    return a + (b - a) * (c[:m] / c[m])
+
+
+class ChunkStream:
+    """
+    Lazy генериране на world objects по chunk-ове.
+
+    Всеки chunk има собствен seed (seed, index), затова layout-ът е един и
+    същ независимо кога/в какъв ред се генерират chunk-овете. Генерира се
+    chunk, щом влезе във view depth; обектите на keep_behind зад играча се
+    махат. keep_behind трябва да е >= разстоянието между checkpoints, за да
+    може respawn назад да не регенерира (и да не губи избутани obstacles).
+
+    Поставяне (stratified jitter с min gap, линейно време):
+    n обекта в [z_start, z_end] с разстояние >= gap са z_i = z_start + u_i + i*gap,
+    където u_0 <= ... <= u_{n-1} са в [0, S], S = span - (n-1)*gap ("slack").
+    Slack-ът се дели на n_chunks равни части; chunk j получава индексите
+    [floor(n*j/K), floor(n*(j+1)/K)) и сортирани uniform u-та в своята част.
+    Така сумата е точно count, gap-ът важи и между chunk-овете, а всеки chunk
+    се генерира сам за O(броя си обекти). Ако count не се събира (S < 0),
+    feasible е False и count се намалява до максимума, който се събира.
+    """
+
+    def __init__(
+        self,
+        *,
+        seed: int,
+        z_start: float,
+        z_end: float,
+        count: int,
+        generate: ChunkGenerator,
+        gap: float = 0.0,
+        chunk_length: float = 1500.0,
+        keep_behind: float = 600.0,
+    ):
+        self.seed = int(seed)
+        self.z_start = float(z_start)
+        self.z_end = max(float(z_end), self.z_start)
+        self.gap = max(0.0, float(gap))
+        self.generate = generate
+        self.chunk_length = float(chunk_length)
+        self.keep_behind = float(keep_behind)
+
+        span = self.z_end - self.z_start
+        self.requested = max(0, int(count))
+        fits = int(span // self.gap) + 1 if self.gap > 0.0 else self.requested
+        self.feasible = self.requested <= fits
+        self.count = min(self.requested, fits)
+        self.slack = span - max(self.count - 1, 0) * self.gap
+
+        self.n_chunks = max(1, math.ceil(span / self.chunk_length)) if span > 0 else 1
+        self._starts = [self.chunk_bounds(j)[0] for j in range(self.n_chunks)]
+
+        self.index = ZIndex()
+        self.generated = 0  # общо генерирани chunk-ове (статистика)
+        self.reset()
+
+    def reset(self) -> None:
+        """Забравя всичко; следващият update() генерира наново от текущата позиция."""
+        self.index = ZIndex()
+        self._next: Optional[int] = None  # следващият chunk за генериране
+        self._lo_z = math.inf  # под това z обектите може да липсват (evicted/негенерирани)
+
+    def chunk_seed(self, j: int) -> int:
+        return self.seed * 1_000_003 + j
+
+    def _first_item(self, j: int) -> int:
+        return (self.count * j) // self.n_chunks
+
+    def chunk_items(self, j: int) -> Tuple[int, int]:
+        """[i0, i1) глобални индекси на обектите в chunk j."""
+        return self._first_item(j), self._first_item(j + 1)
+
+    def chunk_bounds(self, j: int) -> Tuple[float, float]:
+        """z обхватът, в който лежат обектите на chunk j."""
+        a = self.slack * j / self.n_chunks
+        b = self.slack * (j + 1) / self.n_chunks
+        i0, i1 = self.chunk_items(j)
+        lo = self.z_start + a + i0 * self.gap
+        hi = self.z_start + b + max(i1 - 1, i0) * self.gap
+        return lo, min(hi, self.z_end)
+
+    def chunk_count(self, j: int) -> int:
+        i0, i1 = self.chunk_items(j)
+        return i1 - i0
+
+    def positions(self, j: int, rng: Optional[random.Random] = None) -> np.ndarray:
+        """z-тата (сортирани) на chunk j."""
+        if rng is None:
+            rng = random.Random(self.chunk_seed(j))
+        i0, i1 = self.chunk_items(j)
+        a = self.slack * j / self.n_chunks
+        b = self.slack * (j + 1) / self.n_chunks
+        u = sorted_uniforms(rng, a, b, i1 - i0)
+        return self.z_start + u + np.arange(i0, i1, dtype=np.float64) * self.gap
+
+    def _chunk_of(self, z: float) -> int:
+        return max(bisect_right(self._starts, z) - 1, 0)
+
+    def update(self, distance: float, ahead: float) -> None:
+        """Осигурява обектите в [distance, distance + ahead] и маха тези зад keep_behind."""
+        if distance < self._lo_z:
+            # назад отвъд evicted частта (нов run) -> наново от тук
+            self.reset()
+            self._next = self._chunk_of(distance)
+            self._lo_z = min(distance, self._starts[self._next])
+
+        last = self._chunk_of(distance + ahead)
+        while self._next <= last:
+            self._generate(self._next)
+            self._next += 1
+
+        # eviction на стъпки от chunk, а не всеки кадър
+        cut = distance - self.keep_behind
+        if cut > self._lo_z + self.chunk_length:
+            self.index.drop_before(cut)
+            self._lo_z = cut
+
+    def _generate(self, j: int) -> None:
+        if self.chunk_count(j) <= 0:
+            return
+        rng = random.Random(self.chunk_seed(j))
+        z = self.positions(j, rng)
+        self.index.extend(z, **self.generate(rng, z))
+        self.generated += 1
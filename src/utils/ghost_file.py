@@ -0,0 +1,304 @@
+"""
+Binary ghost format (.ghost).
+
+    header  : 64 bytes, виж HEADER
+    payload : колони t float32[n] | d float32[n] | lane float32[n] | dir int8[n]
+
+flags:
+    FLAG_DELTA - t и d са записани като float32 разлики (първата = абсолютна стойност)
+    FLAG_ZLIB  - payload-ът е zlib-компресиран
+    FLAG_ROWS  - payload-ът е редове (t, d, lane, dir) вместо колони; така се пише
+                 run-ът по време на каране (GhostStream, append-only)
+
+Без FLAG_DELTA/FLAG_ZLIB колоните се четат директно от mmap-а (np.frombuffer, без копие).
+Legacy JSON ghost-ите (version 1, dict per sample) се четат с read_legacy_json().
+"""
+from __future__ import annotations
+import json
+import mmap
+import os
+import struct
+import zlib
+from typing import Optional
+
+import numpy as np
+
+MAGIC = b"LDGH"
+VERSION = 1
+GHOST_EXT = ".ghost"
+
+FLAG_DELTA = 1 << 0
+FLAG_ZLIB = 1 << 1
+FLAG_ROWS = 1 << 2
+
+# magic | version | flags | level | count | best_time | payload_len | username (utf-8, null-padded)
+HEADER = struct.Struct("<4sHHIIdI32s4x")
+
+T_DTYPE = np.dtype("<f4")
+DIR_DTYPE = np.dtype("i1")
+ROW_BYTES = 3 * T_DTYPE.itemsize + DIR_DTYPE.itemsize
+# редът при FLAG_ROWS (packed, без padding)
+ROW_DTYPE = np.dtype([("t", T_DTYPE), ("d", T_DTYPE), ("lane", T_DTYPE), ("dir", DIR_DTYPE)])
+
+
+class GhostFormatError(ValueError):
+    pass
+
+
+class GhostData:
+    """
+    Един ghost run като колони (numpy масиви).
+    Когато е mmap-нат, масивите са view-та в mapping-а -> close() преди презапис на файла.
+    """
+    def __init__(
+        self,
+        *,
+        username: str,
+        level: int,
+        best_time: Optional[float],
+        t: np.ndarray,
+        d: np.ndarray,
+        lane: np.ndarray,
+        dir: np.ndarray,
+        mm: Optional[mmap.mmap] = None,
+    ):
+        self.username = username
+        self.level = int(level)
+        self.best_time = best_time
+        self.t = t
+        self.d = d
+        self.lane = lane
+        self.dir = dir
+        self._mm = mm
+
+    def __len__(self) -> int:
+        return len(self.t)
+
+    @property
+    def mapped(self) -> bool:
+        return self._mm is not None
+
+    def close(self) -> None:
+        if self._mm is None:
+            return
+        empty_f = np.empty(0, dtype=T_DTYPE)
+        self.t = self.d = self.lane = empty_f
+        self.dir = np.empty(0, dtype=DIR_DTYPE)
+        try:
+            self._mm.close()
+        except BufferError:
+            pass  # някой още държи view -> GC ще го затвори
+        self._mm = None
+
+
+# ---------- write ----------
+
+def encode(
+    *,
+    username: str,
+    level: int,
+    best_time: Optional[float],
+    t,
+    d,
+    lane,
+    dir,
+    delta: bool = False,
+    compress: bool = False,
+) -> bytes:
+    t = np.asarray(t, dtype=T_DTYPE)
+    d = np.asarray(d, dtype=T_DTYPE)
+    lane = np.asarray(lane, dtype=T_DTYPE)
+    dir = np.clip(np.asarray(dir), -1, 1).astype(DIR_DTYPE)
+    n = len(t)
+    if not (len(d) == len(lane) == len(dir) == n):
+        raise GhostFormatError("column length mismatch")
+
+    flags = 0
+    if delta and n:
+        # разликите се смятат от вече закръглените float32 стойности
+        t = np.diff(t.astype(np.float64), prepend=0.0).astype(T_DTYPE)
+        d = np.diff(d.astype(np.float64), prepend=0.0).astype(T_DTYPE)
+        flags |= FLAG_DELTA
+
+    payload = b"".join((t.tobytes(), d.tobytes(), lane.tobytes(), dir.tobytes()))
+    if compress:
+        payload = zlib.compress(payload, 9)
+        flags |= FLAG_ZLIB
+
+    name = (username or "").encode("utf-8")[:32]
+    bt = float("nan") if best_time is None else float(best_time)
+    header = HEADER.pack(MAGIC, VERSION, flags, int(level), n, bt, len(payload), name)
+    return header + payload
+
+
+def write_ghost(path: str, **kwargs) -> None:
+    """Atomic: пише в .tmp и го rename-ва върху path."""
+    data = encode(**kwargs)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+# ---------- read ----------
+
+def _columns(buf, n: int, offset: int):
+    size = T_DTYPE.itemsize * n
+    t = np.frombuffer(buf, dtype=T_DTYPE, count=n, offset=offset)
+    d = np.frombuffer(buf, dtype=T_DTYPE, count=n, offset=offset + size)
+    lane = np.frombuffer(buf, dtype=T_DTYPE, count=n, offset=offset + 2 * size)
+    dir = np.frombuffer(buf, dtype=DIR_DTYPE, count=n, offset=offset + 3 * size)
+    return t, d, lane, dir
+
+
+def read_ghost(path: str, *, use_mmap: bool = True) -> GhostData:
+    """
+    use_mmap=True: колоните са view-та в mmap-а (без копие) за layout-и без
+    decode; use_mmap=False чете файла в паметта (файлът може веднага да се презапише).
+    """
+    mm = None
+    if use_mmap:
+        with open(path, "rb") as f:
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise GhostFormatError(f"empty ghost file: {path}")
+        buf = mm
+    else:
+        with open(path, "rb") as f:
+            buf = f.read()
+
+    try:
+        if len(buf) < HEADER.size:
+            raise GhostFormatError(f"truncated ghost file: {path}")
+        magic, version, flags, level, n, best_time, payload_len, name = HEADER.unpack_from(buf, 0)
+        if magic != MAGIC:
+            raise GhostFormatError(f"not a ghost file: {path}")
+        if version != VERSION:
+            raise GhostFormatError(f"unsupported ghost version {version}: {path}")
+        if HEADER.size + payload_len > len(buf):
+            raise GhostFormatError(f"truncated ghost payload: {path}")
+
+        meta = dict(
+            username=name.rstrip(b"\0").decode("utf-8", "replace"),
+            level=level,
+            best_time=None if best_time != best_time else best_time,  # NaN -> None
+        )
+
+        if flags in (0, FLAG_ROWS):
+            if payload_len != ROW_BYTES * n:
+                raise GhostFormatError(f"bad payload size: {path}")
+            if flags & FLAG_ROWS:
+                rows = np.frombuffer(buf, dtype=ROW_DTYPE, count=n, offset=HEADER.size)
+                t, d, lane, dir = rows["t"], rows["d"], rows["lane"], rows["dir"]
+            else:
+                t, d, lane, dir = _columns(buf, n, HEADER.size)
+            return GhostData(t=t, d=d, lane=lane, dir=dir, mm=mm, **meta)
+
+        if flags & FLAG_ROWS:
+            raise GhostFormatError(f"unsupported ghost flags {flags}: {path}")
+        payload = bytes(buf[HEADER.size:HEADER.size + payload_len])
+    except Exception:
+        if mm is not None:
+            mm.close()
+        raise
+    if mm is not None:
+        mm.close()
+
+    if flags & FLAG_ZLIB:
+        try:
+            payload = zlib.decompress(payload)
+        except zlib.error as e:
+            raise GhostFormatError(f"corrupt ghost payload: {path}: {e}")
+    if len(payload) != ROW_BYTES * n:
+        raise GhostFormatError(f"bad payload size: {path}")
+
+    t, d, lane, dir = _columns(payload, n, 0)
+    if flags & FLAG_DELTA:
+        t = np.cumsum(t, dtype=np.float64).astype(T_DTYPE)
+        d = np.cumsum(d, dtype=np.float64).astype(T_DTYPE)
+    return GhostData(t=t, d=d, lane=lane, dir=dir, **meta)
+
+
+# ---------- streaming (append-only, row layout) ----------
+
+class GhostStream:
+    """
+    Append-only запис на run: header (count=0) + редове по ROW_DTYPE.
+    finish() попълва header-а; файлът след това е валиден .ghost (FLAG_ROWS).
+    Не е thread-safe: ползва се само от writer thread-а.
+    """
+    def __init__(self, path: str, *, username: str, level: int):
+        self.path = path
+        self.username = username
+        self.level = int(level)
+        self.count = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._f = open(path, "wb")
+        self._f.write(self._header(None))
+
+    def _header(self, best_time: Optional[float]) -> bytes:
+        name = (self.username or "").encode("utf-8")[:32]
+        bt = float("nan") if best_time is None else float(best_time)
+        return HEADER.pack(MAGIC, VERSION, FLAG_ROWS, self.level, self.count, bt, self.count * ROW_BYTES, name)
+
+    def append(self, rows: bytes) -> None:
+        self._f.write(rows)
+        self.count += len(rows) // ROW_BYTES
+
+    def finish(self, best_time: Optional[float] = None) -> None:
+        self._f.seek(0)
+        self._f.write(self._header(best_time))
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self._f.close()
+
+    def abort(self) -> None:
+        self._f.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def pack_rows(t, d, lane, dir) -> bytes:
+    rows = np.empty(len(t), dtype=ROW_DTYPE)
+    rows["t"] = t
+    rows["d"] = d
+    rows["lane"] = lane
+    rows["dir"] = dir
+    return rows.tobytes()
+
+
+def read_legacy_json(path: str) -> GhostData:
+    """Старият формат: {"version": 1, ..., "samples": [{"t", "d", "lane", "dir"}, ...]}."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    samples = data.get("samples", [])
+    if not isinstance(samples, list):
+        raise GhostFormatError(f"bad samples in {path}")
+
+    bt = data.get("best_time")
+    try:
+        best_time = float(bt)
+    except (TypeError, ValueError):
+        best_time = None
+
+    n = len(samples)
+    t = np.fromiter((s["t"] for s in samples), dtype=T_DTYPE, count=n)
+    d = np.fromiter((s["d"] for s in samples), dtype=T_DTYPE, count=n)
+    lane = np.fromiter((s.get("lane", 0.0) for s in samples), dtype=T_DTYPE, count=n)
+    dir = np.fromiter((s.get("dir", 0) for s in samples), dtype=np.int64, count=n)
+    dir = np.clip(dir, -1, 1).astype(DIR_DTYPE)
+
+    return GhostData(
+        username=str(data.get("username", "")),
+        level=int(data.get("level", 0)),
+        best_time=best_time,
+        t=t,
+        d=d,
+        lane=lane,
+        dir=dir,
+    )
@@ -0,0 +1,139 @@
+"""
+Error-bounded decimation на ghost записи (Ramer-Douglas-Peucker по времето).
+
+Sample се маха, ако линейната интерполация между съседните запазени samples
+остава в рамките на eps_d (distance) и eps_lane (lane). Смените на dir се
+пазят точно: и двата samples около всяка смяна винаги остават.
+
+Report tool:
+
+    cd src
+    python -m utils.ghost_simplify ../data/ghosts/a/level_1.json [--eps-d 0.5] [--eps-lane 0.005]
+"""
+from __future__ import annotations
+import argparse
+import os
+import sys
+from typing import Tuple
+
+import numpy as np
+
+DEFAULT_EPS_D = 0.5
+DEFAULT_EPS_LANE = 0.005
+
+
+def simplify_indices(t, d, lane, dir, *, eps_d: float, eps_lane: float) -> np.ndarray:
+    """Индексите (сортирани) на samples, които трябва да останат."""
+    n = len(t)
+    if n <= 2:
+        return np.arange(n)
+    if eps_d <= 0.0 or eps_lane <= 0.0:
+        raise ValueError("eps_d and eps_lane must be > 0")
+
+    t = np.asarray(t, dtype=np.float64)
+    d = np.asarray(d, dtype=np.float64)
+    lane = np.asarray(lane, dtype=np.float64)
+    dir = np.asarray(dir)
+
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    changes = np.flatnonzero(dir[1:] != dir[:-1]) + 1
+    keep[changes] = True
+    keep[changes - 1] = True
+
+    anchors = np.flatnonzero(keep)
+    stack = [(int(a), int(b)) for a, b in zip(anchors[:-1], anchors[1:]) if b - a > 1]
+
+    while stack:
+        a, b = stack.pop()
+        ta, tb = t[a], t[b]
+        if tb > ta:
+            u = (t[a + 1:b] - ta) / (tb - ta)
+        else:
+            u = np.zeros(b - a - 1)
+
+        err = np.maximum(
+            np.abs(d[a + 1:b] - (d[a] + (d[b] - d[a]) * u)) / eps_d,
+            np.abs(lane[a + 1:b] - (lane[a] + (lane[b] - lane[a]) * u)) / eps_lane,
+        )
+        k = int(np.argmax(err))
+        if err[k] <= 1.0:
+            continue
+
+        m = a + 1 + k
+        keep[m] = True
+        if m - a > 1:
+            stack.append((a, m))
+        if b - m > 1:
+            stack.append((m, b))
+
+    return np.flatnonzero(keep)
+
+
+def playback_error(t, d, lane, dir, keep: np.ndarray) -> Tuple[float, float, int]:
+    """
+    (max |d err|, max |lane err|, dir mismatches) на decimated playback-а спрямо raw записа.
+    И двата playback-а са piecewise linear -> максимумът е в raw sample моментите.
+    """
+    t = np.asarray(t, dtype=np.float64)
+    d = np.asarray(d, dtype=np.float64)
+    lane = np.asarray(lane, dtype=np.float64)
+    dir = np.asarray(dir)
+    if len(keep) < 2:
+        return 0.0, 0.0, 0
+
+    tk, dk, lk, rk = t[keep], d[keep], lane[keep], dir[keep]
+    j = np.clip(np.searchsorted(tk, t, side="right") - 1, 0, len(tk) - 2)
+    dt = tk[j + 1] - tk[j]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        u = np.clip(np.where(dt > 0.0, (t - tk[j]) / dt, 0.0), 0.0, 1.0)
+
+    d_err = np.abs(dk[j] + (dk[j + 1] - dk[j]) * u - d)
+    l_err = np.abs(lk[j] + (lk[j + 1] - lk[j]) * u - lane)
+    dir_play = np.where(u < 0.5, rk[j], rk[j + 1])
+    return float(d_err.max()), float(l_err.max()), int(np.count_nonzero(dir_play != dir))
+
+
+def _read_any(path: str):
+    from utils.ghost_file import GHOST_EXT, read_ghost, read_legacy_json
+    if path.endswith(GHOST_EXT):
+        return read_ghost(path)
+    return read_legacy_json(path)
+
+
+def main(argv=None) -> int:
+    from utils.ghost_file import encode
+
+    parser = argparse.ArgumentParser(description="Report ghost decimation ratio and playback error.")
+    parser.add_argument("paths", nargs="+", help=".ghost or legacy .json files")
+    parser.add_argument("--eps-d", type=float, default=DEFAULT_EPS_D)
+    parser.add_argument("--eps-lane", type=float, default=DEFAULT_EPS_LANE)
+    args = parser.parse_args(argv)
+
+    status = 0
+    for path in args.paths:
+        try:
+            g = _read_any(path)
+        except Exception as e:
+            print(f"{path}: cannot read ({e})", file=sys.stderr)
+            status = 1
+            continue
+
+        keep = simplify_indices(g.t, g.d, g.lane, g.dir, eps_d=args.eps_d, eps_lane=args.eps_lane)
+        err_d, err_lane, dir_bad = playback_error(g.t, g.d, g.lane, g.dir, keep)
+
+        meta = dict(username=g.username, level=g.level, best_time=g.best_time)
+        raw_bytes = len(encode(t=g.t, d=g.d, lane=g.lane, dir=g.dir, **meta))
+        dec_bytes = len(encode(t=g.t[keep], d=g.d[keep], lane=g.lane[keep], dir=g.dir[keep], **meta))
+        n, k = len(g), len(keep)
+
+        print(f"{path}")
+        print(f"  source file : {os.path.getsize(path)} bytes")
+        print(f"  samples     : {n} -> {k} ({n / max(k, 1):.1f}x)")
+        print(f"  .ghost size : {raw_bytes} -> {dec_bytes} bytes ({raw_bytes / max(dec_bytes, 1):.1f}x)")
+        print(f"  max error   : d {err_d:.4f} (eps {args.eps_d}), lane {err_lane:.5f} (eps {args.eps_lane}), dir mismatches {dir_bad}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
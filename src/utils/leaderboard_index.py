@@ -0,0 +1,328 @@
+"""
+Малък on-disk индекс за leaderboard-и: best times от профилите и метаданни
+на best ghost-ите, без да се отварят/парсват самите файлове при всяка заявка.
+
+    cache/leaderboard.json
+        profiles : username -> {mtime_ns, size, best_times: {"level_N": t}}
+        ghosts   : "user/level_N" -> {file, size, mtime_ns, offset, count, best_time}
+
+Обновява се инкрементално от save_profile() и GhostSystem.save_recording_as_best();
+записът на файла е debounce-нат (най-много веднъж на SAVE_INTERVAL + при изход).
+
+Lazy rebuild: заявката stat-ва само директорията си (data/players или
+data/ghosts). Пълна сверка (scandir + stat на файловете; препрочитат се само
+записите с различни mtime/size, изтритите отпадат) има при първата заявка в
+процеса, при сменен mtime на директорията (нов/изтрит/rename-нат файл) и
+най-много веднъж на VALIDATE_INTERVAL - за файлове, пренаписани на място от
+друг процес.
+"""
+from __future__ import annotations
+import atexit
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from utils.baked_assets import PROJECT_ROOT
+from utils.ghost_file import GHOST_EXT, HEADER, GhostFormatError, read_legacy_json
+
+INDEX_VERSION = 1
+INDEX_PATH = os.path.join(PROJECT_ROOT, "cache", "leaderboard.json")
+GHOST_DIR = os.path.join(PROJECT_ROOT, "data", "ghosts")
+
+VALIDATE_INTERVAL = 30.0  # s между пълните сверки при непроменена директория
+SAVE_INTERVAL = 2.0  # s между записите на индекса при поредица от note_*()
+
+
+def _stat_key(st: os.stat_result) -> Tuple[int, int]:
+    return st.st_mtime_ns, st.st_size
+
+
+def _level_of(name: str) -> Optional[int]:
+    """level_3.ghost / level_3.json -> 3; level_3.last.ghost и т.н. -> None."""
+    stem, ext = os.path.splitext(name)
+    if ext not in (GHOST_EXT, ".json") or not stem.startswith("level_"):
+        return None
+    try:
+        return int(stem[len("level_"):])
+    except ValueError:
+        return None
+
+
+def _read_ghost_meta(path: str) -> Optional[dict]:
+    """Само header-а (64 bytes) за .ghost; legacy JSON се парсва целия (веднъж)."""
+    try:
+        if path.endswith(GHOST_EXT):
+            with open(path, "rb") as f:
+                head = f.read(HEADER.size)
+            if len(head) < HEADER.size:
+                return None
+            _, _, _, _, n, best_time, _, _ = HEADER.unpack(head)
+            bt = None if best_time != best_time else round(best_time, 3)
+            return {"offset": HEADER.size, "count": n, "best_time": bt}
+
+        g = read_legacy_json(path)
+        return {"offset": None, "count": len(g), "best_time": g.best_time}
+    except (OSError, ValueError, KeyError, GhostFormatError):
+        return None
+
+
+def _read_profile_times(path: str) -> Optional[Dict[str, float]]:
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    times = data.get("best_times") if isinstance(data, dict) else None
+    return dict(times) if isinstance(times, dict) else {}
+
+
+def _dir_mtime(path: Optional[str]) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns if path else None
+    except OSError:
+        return None
+
+
+class LeaderboardIndex:
+    def __init__(self, *, profile_dir: Optional[str], ghost_dir: str = GHOST_DIR, path: str = INDEX_PATH):
+        """profile_dir=None: профилите не са JSON файлове (sqlite backend) -> само ghosts."""
+        self.profile_dir = profile_dir
+        self.ghost_dir = ghost_dir
+        self.path = path
+        self._lock = threading.Lock()  # ghost save-ът идва от writer thread-а
+        self._profiles: Dict[str, dict] = {}
+        self._ghosts: Dict[str, dict] = {}
+        self._loaded = False
+        # part -> (mtime_ns на директорията, monotonic време) при последната пълна сверка
+        self._checked: Dict[str, Tuple[Optional[int], float]] = {}
+        self._dirty = False
+        self._saved_at = 0.0
+
+    # ---------- persistence ----------
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION:
+                self._profiles = data.get("profiles", {})
+                self._ghosts = data.get("ghosts", {})
+        except (OSError, ValueError, AttributeError):
+            pass  # няма/повреден индекс -> validate() ще го построи наново
+
+    def _save(self) -> None:
+        self._dirty = False
+        self._saved_at = time.monotonic()
+        data = {"version": INDEX_VERSION, "profiles": self._profiles, "ghosts": self._ghosts}
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"[leaderboard] cannot write index: {e}")
+
+    def _changed(self) -> None:
+        """Под lock-а: индексът е променен; записва се веднага или при следващия flush()."""
+        self._dirty = True
+        if time.monotonic() - self._saved_at >= SAVE_INTERVAL:
+            self._save()
+
+    def flush(self) -> None:
+        """Записва отложените промени (вика се и при изход от процеса)."""
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    # ---------- incremental updates ----------
+
+    def note_profile(self, path: str, data: dict) -> None:
+        """Вика се след save_profile(); data е току-що записаният профил."""
+        username = data.get("username")
+        if not username:
+            return
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+        with self._lock:
+            self._load()
+            mtime_ns, size = _stat_key(st)
+            self._profiles[username] = {
+                "mtime_ns": mtime_ns,
+                "size": size,
+                "best_times": dict(data.get("best_times", {})),
+            }
+            self._changed()
+
+    def note_ghost(self, path: str) -> None:
+        """Вика се, когато best ghost файлът е готов (от writer thread-а)."""
+        user = os.path.basename(os.path.dirname(path))
+        level = _level_of(os.path.basename(path))
+        if level is None:
+            return
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+        meta = _read_ghost_meta(path)
+        if meta is None:
+            return
+        with self._lock:
+            self._load()
+            mtime_ns, size = _stat_key(st)
+            self._ghosts[f"{user}/level_{level}"] = {
+                "file": os.path.basename(path),
+                "size": size,
+                "mtime_ns": mtime_ns,
+                **meta,
+            }
+            self._changed()
+
+    # ---------- validation ----------
+
+    def validate(self) -> int:
+        """
+        Пълна сверка с диска (scandir + stat); препрочита само файловете
+        с различни mtime/size. Връща броя препрочетени/махнати записи.
+        """
+        return self._refresh("profiles", force=True) + self._refresh("ghosts", force=True)
+
+    def _refresh(self, part: str, *, force: bool = False) -> int:
+        """Lazy rebuild на part ("profiles"/"ghosts"), ако директорията му е сменена/стара."""
+        directory = self.profile_dir if part == "profiles" else self.ghost_dir
+        if directory is None:
+            return 0
+        mtime = _dir_mtime(directory)
+        now = time.monotonic()
+        with self._lock:
+            self._load()
+            last = self._checked.get(part)
+            if not force and last is not None and last[0] == mtime and now - last[1] < VALIDATE_INTERVAL:
+                return 0
+            changed = self._validate_profiles() if part == "profiles" else self._validate_ghosts()
+            self._checked[part] = (mtime, now)
+            if changed:
+                self._changed()
+            return changed
+
+    def _validate_profiles(self) -> int:
+        seen = set()
+        changed = 0
+        try:
+            entries = list(os.scandir(self.profile_dir))
+        except OSError:
+            entries = []
+        for e in entries:
+            if not e.name.endswith(".json") or not e.is_file():
+                continue
+            username = e.name[:-len(".json")]
+            seen.add(username)
+            mtime_ns, size = _stat_key(e.stat())
+            cur = self._profiles.get(username)
+            if cur and cur.get("mtime_ns") == mtime_ns and cur.get("size") == size:
+                continue
+            times = _read_profile_times(e.path)
+            if times is None:
+                continue
+            self._profiles[username] = {"mtime_ns": mtime_ns, "size": size, "best_times": times}
+            changed += 1
+
+        for username in [u for u in self._profiles if u not in seen]:
+            del self._profiles[username]
+            changed += 1
+        return changed
+
+    def _validate_ghosts(self) -> int:
+        found: Dict[str, os.DirEntry] = {}
+        try:
+            users = [e for e in os.scandir(self.ghost_dir) if e.is_dir()]
+        except OSError:
+            users = []
+        for u in users:
+            try:
+                files = list(os.scandir(u.path))
+            except OSError:
+                continue
+            for e in files:
+                level = _level_of(e.name)
+                if level is None:
+                    continue
+                key = f"{u.name}/level_{level}"
+                # .ghost има предимство пред legacy .json (както load_best_ghost)
+                prev = found.get(key)
+                if prev is None or e.name.endswith(GHOST_EXT):
+                    found[key] = e
+
+        changed = 0
+        for key, e in found.items():
+            mtime_ns, size = _stat_key(e.stat())
+            cur = self._ghosts.get(key)
+            if (
+                cur
+                and cur.get("file") == e.name
+                and cur.get("mtime_ns") == mtime_ns
+                and cur.get("size") == size
+            ):
+                continue
+            meta = _read_ghost_meta(e.path)
+            if meta is None:
+                self._ghosts.pop(key, None)
+            else:
+                self._ghosts[key] = {"file": e.name, "size": size, "mtime_ns": mtime_ns, **meta}
+            changed += 1
+
+        for key in [k for k in self._ghosts if k not in found]:
+            del self._ghosts[key]
+            changed += 1
+        return changed
+
+    # ---------- queries ----------
+
+    def best_times(self, level: int, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """(username, best_time) от профилите, най-бързите първи."""
+        self._refresh("profiles")
+        key = f"level_{int(level)}"
+        with self._lock:
+            rows = []
+            for username, entry in self._profiles.items():
+                t = entry.get("best_times", {}).get(key)
+                if isinstance(t, (int, float)):
+                    rows.append((username, float(t)))
+        rows.sort(key=lambda r: (r[1], r[0]))
+        return rows[:limit] if limit is not None else rows
+
+    def ghosts(self, level: int, limit: Optional[int] = None) -> List[Tuple[str, dict]]:
+        """(username, ghost meta) за level-а, сортирани по best_time (без time накрая)."""
+        self._refresh("ghosts")
+        suffix = f"/level_{int(level)}"
+        with self._lock:
+            rows = [
+                (key[: -len(suffix)], dict(meta))
+                for key, meta in self._ghosts.items()
+                if key.endswith(suffix)
+            ]
+        inf = float("inf")
+        rows.sort(key=lambda r: (r[1]["best_time"] if r[1].get("best_time") is not None else inf, r[0]))
+        return rows[:limit] if limit is not None else rows
+
+
+_index: Optional[LeaderboardIndex] = None
+
+
+def leaderboard() -> LeaderboardIndex:
+    """Process-wide индекс (създава се при първа употреба)."""
+    global _index
+    if _index is None:
+        from settings1 import PROFILE_BACKEND
+        from utils.profile_manager import PROFILE_DIR
+        # при sqlite backend best times идват от базата, а не от data/players/*.json
+        _index = LeaderboardIndex(profile_dir=PROFILE_DIR if PROFILE_BACKEND == "json" else None)
+        atexit.register(_index.flush)
+    return _index
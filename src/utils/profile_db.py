@@ -0,0 +1,209 @@
+"""
+SQLite store за профилите (PROFILE_BACKEND = "sqlite" в settings1).
+
+    profiles   (username PK, data)               - целият профил като JSON
+    best_times (username, level, time) PK(username, level)
+               + index (level, time)             - top N / rank на level
+
+best_times е денормализирано копие на profile["best_times"] и се пише в
+същата транзакция като профила.
+
+One-shot миграция от data/players/*.json:
+
+    cd src
+    python -m utils.profile_db migrate [--db data/players.db] [--src data/players]
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+from typing import Dict, List, Optional, Tuple
+
+DB_PATH = os.path.join("data", "players.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    username TEXT PRIMARY KEY,
+    data     TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS best_times (
+    username TEXT    NOT NULL REFERENCES profiles(username) ON DELETE CASCADE,
+    level    INTEGER NOT NULL,
+    time     REAL    NOT NULL,
+    PRIMARY KEY (username, level)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS best_times_level_time ON best_times(level, time);
+"""
+
+
+def _level_times(data: dict) -> List[Tuple[int, float]]:
+    """{"level_2": 31.5, ...} -> [(2, 31.5), ...]; непознатите ключове се пропускат."""
+    out = []
+    for key, t in (data.get("best_times") or {}).items():
+        if not isinstance(key, str) or not key.startswith("level_"):
+            continue
+        try:
+            out.append((int(key[len("level_"):]), float(t)))
+        except (TypeError, ValueError):
+            continue
+    return out
+
+
+class ProfileDB:
+    def __init__(self, path: str = DB_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # save_profile може да дойде и от друг thread -> една връзка + lock
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    # ---------- profile API ----------
+
+    def create(self, data: dict) -> bool:
+        """False ако username-ът вече съществува."""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute(
+                    "INSERT INTO profiles (username, data) VALUES (?, ?)",
+                    (data["username"], json.dumps(data)),
+                )
+                self._write_times(data)
+                self._conn.execute("COMMIT")
+            except sqlite3.IntegrityError:
+                self._conn.execute("ROLLBACK")
+                return False
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return True
+
+    def load(self, username: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM profiles WHERE username = ?", (username,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, data: dict) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute(
+                    "INSERT INTO profiles (username, data) VALUES (?, ?) "
+                    "ON CONFLICT(username) DO UPDATE SET data = excluded.data",
+                    (data["username"], json.dumps(data)),
+                )
+                self._write_times(data)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _write_times(self, data: dict) -> None:
+        username = data["username"]
+        self._conn.execute("DELETE FROM best_times WHERE username = ?", (username,))
+        self._conn.executemany(
+            "INSERT INTO best_times (username, level, time) VALUES (?, ?, ?)",
+            [(username, level, t) for level, t in _level_times(data)],
+        )
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
+
+    # ---------- queries ----------
+
+    def top(self, level: int, limit: int = 10) -> List[Tuple[str, float]]:
+        """Най-бързите limit профила на level-а (index range scan по (level, time))."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT username, time FROM best_times WHERE level = ? "
+                "ORDER BY time, username LIMIT ?",
+                (int(level), int(limit)),
+            ).fetchall()
+
+    def rank(self, username: str, level: int) -> Optional[int]:
+        """1-based ранг на user-а на level-а (равни времена делят ранга); None без време."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 + (SELECT COUNT(*) FROM best_times o WHERE o.level = b.level AND o.time < b.time) "
+                "FROM best_times b WHERE b.username = ? AND b.level = ?",
+                (username, int(level)),
+            ).fetchone()
+        return row[0] if row else None
+
+    # ---------- migration ----------
+
+    def import_json_dir(self, src_dir: str, *, overwrite: bool = False) -> Dict[str, int]:
+        """Една транзакция за всички файлове; връща броячи imported/skipped/failed."""
+        stats = {"imported": 0, "skipped": 0, "failed": 0}
+        try:
+            names = sorted(n for n in os.listdir(src_dir) if n.endswith(".json"))
+        except OSError:
+            return stats
+
+        profiles = []
+        for name in names:
+            try:
+                with open(os.path.join(src_dir, name), "r") as f:
+                    data = json.load(f)
+                data["username"]  # задължително поле
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                print(f"[profiles] cannot migrate {name}: {e}")
+                stats["failed"] += 1
+                continue
+            profiles.append(data)
+
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                existing = {r[0] for r in self._conn.execute("SELECT username FROM profiles")}
+                for data in profiles:
+                    if data["username"] in existing and not overwrite:
+                        stats["skipped"] += 1
+                        continue
+                    self._conn.execute(
+                        "INSERT INTO profiles (username, data) VALUES (?, ?) "
+                        "ON CONFLICT(username) DO UPDATE SET data = excluded.data",
+                        (data["username"], json.dumps(data)),
+                    )
+                    self._write_times(data)
+                    stats["imported"] += 1
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return stats
+
+
+def main(argv=None) -> int:
+    from utils.profile_manager import PROFILE_DIR
+
+    parser = argparse.ArgumentParser(description="SQLite profile store tools.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    m = sub.add_parser("migrate", help="import data/players/*.json into the database")
+    m.add_argument("--db", default=DB_PATH)
+    m.add_argument("--src", default=PROFILE_DIR)
+    m.add_argument("--overwrite", action="store_true", help="replace profiles that already exist in the db")
+    args = parser.parse_args(argv)
+
+    db = ProfileDB(args.db)
+    stats = db.import_json_dir(args.src, overwrite=args.overwrite)
+    print(f"{args.src} -> {args.db}: {stats['imported']} imported, {stats['skipped']} skipped, {stats['failed']} failed")
+    db.close()
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,8 @@
 import os
 import json
 
+from settings1 import PROFILE_BACKEND
+
 PROFILE_DIR = os.path.join("data", "players")
 os.makedirs(PROFILE_DIR, exist_ok=True)
 
@@ -10,6 +12,21 @@ DEFAULT_PROFILE = {
     "selected_car": 1
 }
 
+_db = None
+
+
+def _profile_db():
+    """SQLite store-ът (само при PROFILE_BACKEND = "sqlite"); при празна база мигрира JSON файловете."""
+    global _db
+    if _db is None:
+        from utils.profile_db import ProfileDB
+        _db = ProfileDB()
+        if _db.count() == 0:
+            stats = _db.import_json_dir(PROFILE_DIR)
+            if stats["imported"]:
+                print(f"[profiles] migrated {stats['imported']} JSON profiles to {_db.path}")
+    return _db
+
 
 def profile_path(username):
     """Returns the absolute path to a player's save file."""
@@ -19,10 +36,13 @@ def profile_path(username):
 
 def create_profile(username):
     """Creates a new profile file if it doesn't exist."""
+    data = {"username": username, **DEFAULT_PROFILE}
+    if PROFILE_BACKEND == "sqlite":
+        return data if _profile_db().create(data) else None
+
     path = profile_path(username)
     if os.path.exists(path):
         return None  # profile already exists
-    data = {"username": username, **DEFAULT_PROFILE}
     with open(path, "w") as f:
         json.dump(data, f, indent=4)
     return data
@@ -30,6 +50,9 @@ def create_profile(username):
 
 def load_profile(username):
     """Loads existing player data, returns None if not found."""
+    if PROFILE_BACKEND == "sqlite":
+        return _profile_db().load(username)
+
     path = profile_path(username)
     if not os.path.exists(path):
         return None
@@ -41,6 +64,35 @@ def save_profile(data):
     """Saves player data safely."""
     if not data or "username" not in data:
         return
+    if PROFILE_BACKEND == "sqlite":
+        _profile_db().save(data)
+        return
+
     path = profile_path(data["username"])
     with open(path, "w") as f:
         json.dump(data, f, indent=4)
+
+    from utils.leaderboard_index import leaderboard
+    leaderboard().note_profile(path, data)
+
+
+def top_times(level, limit=10):
+    """[(username, best_time), ...] за level-а, най-бързите първи."""
+    if PROFILE_BACKEND == "sqlite":
+        return _profile_db().top(level, limit)
+
+    from utils.leaderboard_index import leaderboard
+    return leaderboard().best_times(level, limit)
+
+
+def rank_of(username, level):
+    """1-based ранг на user-а на level-а, None ако няма време."""
+    if PROFILE_BACKEND == "sqlite":
+        return _profile_db().rank(username, level)
+
+    from utils.leaderboard_index import leaderboard
+    rows = leaderboard().best_times(level)
+    times = dict(rows)
+    if username not in times:
+        return None
+    return 1 + sum(1 for _, t in rows if t < times[username])
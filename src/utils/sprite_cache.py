@@ -0,0 +1,183 @@
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import pygame
+
+from settings1 import SPRITE_CACHE_BUDGET_MB
+
+
+class SpriteCache:
+    """
+    Process-wide cache за scale-нати sprite-ове (props, obstacles, ghost).
+
+    - register() строи mip нива (1, 1/2, 1/4, ...) веднъж при load, или приема
+      готови (build_mips() във фоновия loading job)
+    - get() квантизира scale-а (scale_steps нива на единица) и smoothscale-ва
+      от най-малкото mip ниво, което е >= target размера
+    - пази hit/miss статистика и общия размер в байтове (mip нивата + scale-натите копия)
+    - над budget_bytes изхвърля най-отдавна ползваните (LRU) scale-нати копия;
+      mip нивата остават, докато sprite-ът не се discard()-не
+
+    Имената трябва да идентифицират съдържанието (напр. пътя до PNG-то),
+    защото кешът оцелява между GameScene-и.
+    """
+    def __init__(
+        self,
+        *,
+        budget_bytes: int = 64 * 1024 * 1024,
+        scale_steps: int = 100,
+        min_mip_size: int = 8,
+    ):
+        self.budget_bytes = int(budget_bytes)
+        self.scale_steps = int(scale_steps)
+        self.min_mip_size = int(min_mip_size)
+
+        self._mips: Dict[str, List[pygame.Surface]] = {}
+        self._alpha: Dict[str, Optional[int]] = {}
+        self._scaled: "OrderedDict[Tuple[str, int], pygame.Surface]" = OrderedDict()
+
+        self.bytes = 0  # mip_bytes + scale-натите копия
+        self.mip_bytes = 0  # mip нива 1.. (ниво 0 е base-а на caller-а)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # ---------- registration ----------
+
+    def register(
+        self,
+        name: str,
+        base: pygame.Surface,
+        *,
+        alpha: Optional[int] = None,
+        replace: bool = False,
+        mips: Optional[List[pygame.Surface]] = None,
+    ) -> None:
+        """
+        Registers a base sprite under name and pre-builds its mip levels
+        (or takes mips = levels 1.. from build_mips()).
+        An existing registration is kept unless replace=True.
+        """
+        if name in self._mips and not replace:
+            return
+        if name in self._mips:
+            self.discard(name)
+
+        if mips is None:
+            mips = self.build_mips(base)[1:]
+        mips = [base, *mips]
+
+        self._mips[name] = mips
+        self._alpha[name] = alpha
+        built = sum(self._surface_bytes(m) for m in mips[1:])
+        self.mip_bytes += built
+        self.bytes += built
+        self._evict()
+
+    def build_mips(self, base: pygame.Surface) -> List[pygame.Surface]:
+        """[base, 1/2, 1/4, ...]; не пипа кеша, затова може да се вика и от worker thread."""
+        mips = [base]
+        w, h = base.get_size()
+        while w // 2 >= self.min_mip_size and h // 2 >= self.min_mip_size:
+            w //= 2
+            h //= 2
+            mips.append(pygame.transform.smoothscale(mips[-1], (w, h)))
+        return mips
+
+    def has(self, name: str) -> bool:
+        return name in self._mips
+
+    def base(self, name: str) -> pygame.Surface:
+        """The registered full-size sprite (mip level 0)."""
+        return self._mips[name][0]
+
+    def discard(self, name: str) -> None:
+        """Drops a sprite, its mip levels and all of its scaled copies."""
+        mips = self._mips.pop(name, None)
+        if mips:
+            freed = sum(self._surface_bytes(m) for m in mips[1:])
+            self.mip_bytes -= freed
+            self.bytes -= freed
+        self._alpha.pop(name, None)
+        for key in [k for k in self._scaled if k[0] == name]:
+            self.bytes -= self._surface_bytes(self._scaled.pop(key))
+
+    def clear(self) -> None:
+        self._mips.clear()
+        self._alpha.clear()
+        self._scaled.clear()
+        self.bytes = 0
+        self.mip_bytes = 0
+
+    # ---------- lookup ----------
+
+    def quantize(self, scale: float) -> int:
+        return int(scale * self.scale_steps)
+
+    def get(self, name: str, scale: float) -> pygame.Surface:
+        key = (name, self.quantize(scale))
+        spr = self._scaled.get(key)
+        if spr is not None:
+            self._scaled.move_to_end(key)
+            self.hits += 1
+            return spr
+
+        self.misses += 1
+        spr = self._build(name, key[1] / self.scale_steps)
+        self._scaled[key] = spr
+        self.bytes += self._surface_bytes(spr)
+        self._evict()
+        return spr
+
+    def _build(self, name: str, scale: float) -> pygame.Surface:
+        mips = self._mips[name]
+        base = mips[0]
+        w = max(1, int(base.get_width() * scale))
+        h = max(1, int(base.get_height() * scale))
+
+        src = base
+        for m in mips[1:]:
+            if m.get_width() < w or m.get_height() < h:
+                break
+            src = m
+
+        spr = pygame.transform.smoothscale(src, (w, h))
+
+        alpha = self._alpha.get(name)
+        if alpha is not None:
+            spr = spr.convert_alpha()
+            spr.set_alpha(alpha)
+        return spr
+
+    # ---------- memory budget ----------
+
+    @staticmethod
+    def _surface_bytes(surf: pygame.Surface) -> int:
+        return surf.get_pitch() * surf.get_height()
+
+    def _evict(self) -> None:
+        while self.bytes > self.budget_bytes and len(self._scaled) > 1:
+            _, old = self._scaled.popitem(last=False)
+            self.bytes -= self._surface_bytes(old)
+            self.evictions += 1
+
+    def set_budget(self, budget_bytes: int) -> None:
+        self.budget_bytes = int(budget_bytes)
+        self._evict()
+
+    def stats(self) -> dict:
+        return {
+            "sprites": len(self._mips),
+            "entries": len(self._scaled),
+            "bytes": self.bytes,
+            "mip_bytes": self.mip_bytes,
+            "budget_bytes": self.budget_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+# shared instance за целия процес
+SPRITE_CACHE = SpriteCache(budget_bytes=int(SPRITE_CACHE_BUDGET_MB * 1024 * 1024))
@@ -0,0 +1,75 @@
+from __future__ import annotations
+from typing import Dict, Tuple
+
+import numpy as np
+
+
+class ZIndex:
+    """
+    World objects като struct-of-arrays: колона z (float64, сортирана възходящо)
+    + произволни паралелни колони (kind, side, lane...). Видимият прозорец
+    [z_min, z_max] се намира с np.searchsorted за O(log n), а проекцията на
+    прозореца е една векторна стъпка върху slice-овете на колоните.
+    """
+
+    def __init__(self, z=(), **columns):
+        self.rebuild(z, **columns)
+
+    def rebuild(self, z, **columns) -> None:
+        z = np.asarray(z, dtype=np.float64)
+        order = np.argsort(z, kind="stable")
+        self.z: np.ndarray = z[order]
+        self.columns: Dict[str, np.ndarray] = {
+            name: np.asarray(col)[order] for name, col in columns.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.z)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def window(self, z_min: float, z_max: float) -> Tuple[int, int]:
+        """[lo, hi) индекси на обектите с z_min <= z <= z_max."""
+        lo = int(np.searchsorted(self.z, z_min, side="left"))
+        hi = int(np.searchsorted(self.z, z_max, side="right"))
+        return lo, hi
+
+    def move(self, i: int, z: float) -> None:
+        """
+        Мести обект i на нова z и го слага на правилното място, като измества
+        само редовете между старата и новата позиция (сортът остава валиден).
+        """
+        j = int(np.searchsorted(self.z, z, side="right"))
+        if j > i:
+            j -= 1  # самият i се маха преди вмъкването
+        cols = [self.z, *self.columns.values()]
+        row = [c[i].copy() for c in cols]
+        row[0] = z
+        for c, v in zip(cols, row):
+            if j > i:
+                c[i:j] = c[i + 1:j + 1]
+            elif j < i:
+                c[j + 1:i + 1] = c[j:i]
+            c[j] = v
+
+    def extend(self, z, **columns) -> None:
+        """Добавя нови обекти (напр. току-що генериран chunk) и пази сорта."""
+        z = np.asarray(z, dtype=np.float64)
+        if not len(z):
+            return
+        if not len(self.z):
+            self.rebuild(z, **columns)
+            return
+        self.rebuild(
+            np.concatenate((self.z, z)),
+            **{name: np.concatenate((col, np.asarray(columns[name]))) for name, col in self.columns.items()},
+        )
+
+    def drop_before(self, z_min: float) -> int:
+        """Маха обектите с z < z_min (вече зад играча); връща колко са махнати."""
+        k = int(np.searchsorted(self.z, z_min, side="left"))
+        if k:
+            self.z = self.z[k:]
+            self.columns = {name: col[k:] for name, col in self.columns.items()}
+        return k